@@ -0,0 +1,267 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:  # the polars backend is optional
+    pl = None
+
+
+def _to_dict(series):
+    # the same dict as Series.to_dict(), built from two list conversions instead of boxing item by item
+    return dict(zip(series.index.tolist(), series.to_numpy().tolist()))
+
+
+def _count_stats(counts_with_na, n_rows):
+    """The describe_columns statistics that come from a column's value_counts(dropna=False)."""
+    is_na = counts_with_na.index.isna()
+    counts_wo_na = counts_with_na[~is_na]
+    count_wo_na = int(counts_wo_na.sum())
+    return {
+        "count_of_entries_wo_na": count_wo_na,
+        "nan_count": n_rows - count_wo_na,
+        "count_of_uniques_with_na": len(counts_with_na),
+        "count_of_uniques_wo_na": len(counts_wo_na),
+        "proportion_count_with_na": _to_dict(counts_with_na / n_rows),
+        "proportion_count_wo_na": _to_dict(counts_wo_na / count_wo_na),
+    }
+
+
+def describe_series(col):
+    """Computes every describe_columns statistic for one column from a single value_counts."""
+    stats = _count_stats(col.value_counts(dropna=False), len(col))
+
+    if pd.api.types.is_numeric_dtype(col):
+        quartiles = col.quantile([0.25, 0.5, 0.75])
+        stats.update(
+            {
+                "mean": col.mean(),
+                "std": col.std(),
+                "25%": quartiles[0.25],
+                "50%": quartiles[0.5],
+                "75%": quartiles[0.75],
+            }
+        )
+    if pd.api.types.is_numeric_dtype(col) or pd.api.types.is_datetime64_any_dtype(col):
+        stats["min"] = col.min()
+        stats["max"] = col.max()
+    else:
+        stats["min"] = pd.NA
+        stats["max"] = pd.NA
+    return stats
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, df):
+        """Runs the Visualisation aggregations with pandas on an in-memory DataFrame."""
+        self.source = df
+        self.df = df
+
+    @property
+    def columns(self):
+        return list(self.df.columns)
+
+    @property
+    def n_rows(self):
+        return len(self.df)
+
+    def dtypes(self, null_counts=None):
+        return self.df.dtypes
+
+    def describe_columns(self, max_workers=1, use_processes=False):
+        """Returns column -> describe_columns statistics."""
+        if max_workers == 1:
+            stats = [describe_series(self.df[column]) for column in self.df.columns]
+        else:
+            executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with executor_class(max_workers=max_workers) as executor:
+                stats = list(
+                    executor.map(describe_series, (self.df[column] for column in self.df.columns))
+                )
+        return dict(zip(self.df.columns, stats))
+
+    def value_counts(self, column, dropna):
+        """Returns the count of each value of column, sorted by value."""
+        return self.df[column].value_counts(dropna=dropna).sort_index()
+
+    def select(self, columns):
+        return self.df[list(dict.fromkeys(columns))]
+
+    def partitions(self, columns, by):
+        """Yields (value, rows) for each non-missing value of by, in order of first appearance."""
+        return self.select(columns + [by]).groupby(by, sort=False, observed=True)
+
+    def batches(self, rows=100_000):
+        """Yields the rows as pandas DataFrames of at most rows rows (views of self.df, not copies)."""
+        for start in range(0, len(self.df), rows):
+            yield self.df.iloc[start : start + rows]
+
+
+class PolarsBackend:
+    name = "polars"
+
+    def __init__(self, data):
+        """Runs the Visualisation aggregations on Polars' multi-threaded engine.
+
+        Args:
+            data: A pandas DataFrame, a Polars DataFrame or LazyFrame, or the path or glob of
+                  Parquet files, which are scanned lazily so only the columns a chart needs are read.
+        """
+        if pl is None:
+            raise ImportError("The polars backend needs polars: pip install polars")
+        self.source = data
+        self.pandas_dtypes = None
+        if isinstance(data, pd.DataFrame):
+            self.pandas_dtypes = data.dtypes
+            frame = pl.from_pandas(data, nan_to_null=True).lazy()
+        elif isinstance(data, (str, Path)):
+            frame = pl.scan_parquet(data)
+        elif isinstance(data, pl.DataFrame):
+            frame = data.lazy()
+        elif isinstance(data, pl.LazyFrame):
+            frame = data
+        else:
+            raise TypeError("data should be a pandas DataFrame, a Polars frame or a Parquet path")
+        self.schema = frame.collect_schema()
+        # pandas treats NaN as missing, so do the same for float columns read from Parquet
+        self.frame = frame.with_columns(
+            [pl.col(column).fill_nan(None) for column, dtype in self.schema.items() if dtype.is_float()]
+        )
+        self._n_rows = None
+
+    @property
+    def columns(self):
+        return list(self.schema.names())
+
+    @property
+    def n_rows(self):
+        if self._n_rows is None:
+            self._n_rows = self.frame.select(pl.len()).collect().item()
+        return self._n_rows
+
+    def dtypes(self, null_counts=None):
+        """The pandas dtypes of the columns, as pandas would read them."""
+        if self.pandas_dtypes is not None:
+            return self.pandas_dtypes
+        dtypes = self.frame.head(0).collect().to_pandas().dtypes
+        if null_counts is not None:
+            # pandas reads integer columns with missing values as float64
+            for column, dtype in dtypes.items():
+                if pd.api.types.is_integer_dtype(dtype) and null_counts[column]:
+                    dtypes[column] = np.dtype("float64")
+        return dtypes
+
+    def __numeric_stats(self, column, dtype):
+        col = pl.col(column)
+        if dtype == pl.Boolean:
+            col = col.cast(pl.Int8)
+        expressions = [col.min().alias("min"), col.max().alias("max")]
+        if dtype.is_numeric() or dtype == pl.Boolean:
+            expressions += [
+                col.mean().alias("mean"),
+                col.std().alias("std"),
+                col.quantile(0.25, interpolation="linear").alias("25%"),
+                col.quantile(0.5, interpolation="linear").alias("50%"),
+                col.quantile(0.75, interpolation="linear").alias("75%"),
+            ]
+        return self.frame.select(expressions)
+
+    @staticmethod
+    def __to_pandas_value(value, dtype):
+        if value is None:
+            return pd.NaT if dtype.is_temporal() else np.nan
+        if dtype.is_temporal():
+            return pd.Timestamp(value)
+        return value
+
+    def __value_counts_query(self, column):
+        return self.frame.group_by(column).agg(pl.len().alias("__count"))
+
+    @staticmethod
+    def __to_counts(table, column):
+        table = table.to_pandas()
+        index = pd.Index(table[column], name=column)
+        if index.dtype == object and index.hasnans:
+            # Polars' nulls come back as None, where pandas' value_counts keys them as NaN
+            index = index.where(index.notna(), np.nan)
+        return pd.Series(table["__count"].to_numpy(), index=index)
+
+    def describe_columns(self, max_workers=None, use_processes=False):
+        """Returns column -> describe_columns statistics, matching the pandas backend.
+
+        Every value count and statistic runs as one batch of queries on the Polars thread pool,
+        so max_workers and use_processes are ignored.
+        """
+        ranged = {
+            column: dtype
+            for column, dtype in self.schema.items()
+            # the columns pandas treats as numeric or datetime64
+            if dtype.is_numeric() or dtype == pl.Boolean or isinstance(dtype, pl.Datetime)
+        }
+        queries = [self.__value_counts_query(column) for column in self.columns]
+        queries += [self.__numeric_stats(column, dtype) for column, dtype in ranged.items()]
+        results = pl.collect_all(queries)
+
+        n_rows = self.n_rows
+        stats = {}
+        for column, table in zip(self.columns, results):
+            counts = self.__to_counts(table, column).sort_values(ascending=False, kind="stable")
+            stats[column] = _count_stats(counts, n_rows)
+            stats[column]["min"] = pd.NA
+            stats[column]["max"] = pd.NA
+        for (column, dtype), table in zip(ranged.items(), results[len(self.columns) :]):
+            values = table.row(0, named=True)
+            for name, value in values.items():
+                stats[column][name] = self.__to_pandas_value(
+                    value, dtype if name in ("min", "max") else pl.Float64
+                )
+        return stats
+
+    def value_counts(self, column, dropna):
+        """Returns the count of each value of column, sorted by value."""
+        query = self.__value_counts_query(column)
+        if dropna:
+            query = query.filter(pl.col(column).is_not_null())
+        return self.__to_counts(query.collect(), column).sort_index()
+
+    def select(self, columns):
+        return self.frame.select(list(dict.fromkeys(columns))).collect().to_pandas()
+
+    def partitions(self, columns, by):
+        """Yields (value, rows) for each non-missing value of by, in order of first appearance."""
+        frame = (
+            self.frame.select(list(dict.fromkeys(columns + [by])))
+            .filter(pl.col(by).is_not_null())
+            .collect()
+        )
+        for part in frame.partition_by(by, maintain_order=True):
+            rows = part.to_pandas()
+            yield rows[by].iloc[0], rows
+
+    def batches(self, rows=100_000):
+        """Yields the rows as pandas DataFrames of up to rows rows, e.g. to sketch a Parquet scan.
+
+        Every batch has the dtypes of the whole frame, so an integer column with missing values
+        elsewhere is float64 in every batch, as pandas would read it.
+        """
+        null_counts = self.frame.select(pl.all().null_count()).collect().row(0, named=True)
+        dtypes = self.dtypes(null_counts)
+        for offset in range(0, self.n_rows, rows):
+            batch = self.frame.slice(offset, rows).collect().to_pandas()
+            yield batch.astype(
+                {column: dtype for column, dtype in dtypes.items() if batch[column].dtype != dtype}
+            )
+
+
+def make_backend(data, backend="pandas"):
+    """Returns the backend called backend ('pandas' or 'polars') for data."""
+    if backend == "pandas":
+        return PandasBackend(data)
+    if backend == "polars":
+        return PolarsBackend(data)
+    raise TypeError("backend should be 'pandas' or 'polars'")
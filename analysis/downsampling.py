@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_numbers(x):
+    """Returns x as floats, using positions for x values that are not numbers or dates."""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype("int64").to_numpy(dtype=np.float64)
+    if pd.api.types.is_numeric_dtype(x) and not pd.api.types.is_bool_dtype(x):
+        return x.to_numpy(dtype=np.float64)
+    return np.arange(len(x), dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: picks n_out points that keep the visual shape of a line.
+
+    Args:
+        x (array-like): x values sorted ascending (numbers or dates; anything else is spaced evenly).
+        y (array-like): y values without NaN.
+        n_out (int): Number of points to keep, including the first and last.
+
+    Returns:
+        np.ndarray: Sorted positions of the kept points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_numbers(x), np.asarray(y, dtype=np.float64)
+    # n_out - 2 buckets between the first and last point, which are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[end : edges[i + 2]].mean(), y[end : edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # the point forming the largest triangle with the last kept point and the next bucket's mean
+        areas = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def min_max_indices(y, n_out):
+    """Keeps the first and last point and the minimum and maximum of (n_out - 2) // 2
+    equal-width buckets of positions.
+
+    Args:
+        y (array-like): y values without NaN, in x order.
+        n_out (int): Most points to keep, including the first and last.
+
+    Returns:
+        np.ndarray: Sorted positions of the kept points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    number_of_buckets = (n_out - 2) // 2
+    if number_of_buckets == 0:
+        return np.array([0, n - 1])
+    buckets = np.arange(n) * number_of_buckets // n
+    grouped = pd.Series(np.asarray(y, dtype=np.float64)).groupby(buckets)
+    kept = np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy()])
+    return np.unique(np.concatenate([[0, n - 1], kept]))
+
+
+def downsample_line(x, y, max_points, method="lttb"):
+    """Reduces a line series to at most max_points points, sorted by x, with missing y values dropped.
+
+    Args:
+        x (pd.Series): x values.
+        y (pd.Series): y values, aligned with x.
+        max_points (int): Number of points to keep.
+        method (str, optional): 'lttb' (default) or 'minmax'.
+
+    Returns:
+        tuple: The kept (x, y) Series.
+    """
+    if method not in ("lttb", "minmax"):
+        raise TypeError("method must be 'lttb' or 'minmax'")
+    keep = y.notna().to_numpy()
+    x, y = x[keep], y[keep]
+    if len(y) <= max_points:
+        return x, y
+    order = np.argsort(x.to_numpy(), kind="stable")
+    x, y = x.iloc[order], y.iloc[order]
+    if method == "lttb":
+        positions = lttb_indices(x, y, max_points)
+    else:
+        positions = min_max_indices(y, max_points)
+    return x.iloc[positions], y.iloc[positions]
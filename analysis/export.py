@@ -0,0 +1,130 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+PLOTLY_FORMATS = ("html", "png", "svg")
+MATPLOTLIB_FORMATS = ("png", "svg")
+
+
+def _write_plotly(fig, path, file_format, shared_plotlyjs):
+    if file_format == "html":
+        # 'directory' links the plotly.min.js next to the file instead of embedding ~3.5 MB in each
+        fig.write_html(path, include_plotlyjs="directory" if shared_plotlyjs else True)
+    else:
+        fig.write_image(path, format=file_format)
+
+
+def _export_figure(name, figure, formats, output_folder, shared_plotlyjs):
+    """Writes one figure in each format and returns a timing record per file."""
+    if isinstance(figure, str):
+        # plotly figures are sent to workers as JSON
+        figure = pio.from_json(figure)
+    records = []
+    for file_format in formats:
+        path = Path(output_folder) / f"{name}.{file_format}"
+        start = time.perf_counter()
+        error = None
+        try:
+            if isinstance(figure, go.Figure):
+                _write_plotly(figure, path, file_format, shared_plotlyjs)
+            else:
+                figure.savefig(path, format=file_format, bbox_inches="tight")
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e).strip()}"
+        records.append(
+            {
+                "name": name,
+                "format": file_format,
+                "path": str(path),
+                "seconds": time.perf_counter() - start,
+                "bytes": path.stat().st_size if error is None else None,
+                "pid": os.getpid(),
+                "error": error,
+            }
+        )
+    return records
+
+
+def export_figures(
+    figure_specs, output_folder, formats=("html",), max_workers=None, shared_plotlyjs=True
+):
+    """Writes Plotly and matplotlib figures to files in parallel worker processes.
+
+    Use a Visualisation created with headless=True to get the figures without displaying them.
+
+    Args:
+        figure_specs (list): (name, figure) pairs, or dicts with 'name', 'figure' and optionally
+                             'formats' to override formats for that figure. The name is the file
+                             name without extension.
+        output_folder (str): Folder to write the files to. Created if missing.
+        formats (tuple, optional): Any of 'html', 'png' and 'svg'. Default is ('html',).
+                                   Matplotlib figures (word clouds) skip 'html'; PNG and SVG export
+                                   of Plotly figures needs the kaleido package.
+        max_workers (int, optional): Number of worker processes. Default is None, one per core;
+                                     1 exports in this process.
+        shared_plotlyjs (bool, optional): Write plotly.min.js once to output_folder and link it from
+                                          every HTML file instead of embedding it. Default is True.
+
+    Returns:
+        pd.DataFrame: One row per file with the name, format, path, seconds taken, file size and
+                      any error message. Failed files are reported rather than stopping the export.
+    """
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    for spec in figure_specs:
+        if isinstance(spec, dict):
+            name, figure = spec["name"], spec["figure"]
+            figure_formats = spec.get("formats", formats)
+        else:
+            name, figure = spec
+            figure_formats = formats
+        if isinstance(figure, go.Figure):
+            bad_formats = set(figure_formats) - set(PLOTLY_FORMATS)
+            figure = figure.to_json()
+        else:
+            bad_formats = set(figure_formats) - set(MATPLOTLIB_FORMATS) - {"html"}
+            figure_formats = [f for f in figure_formats if f in MATPLOTLIB_FORMATS]
+        if bad_formats:
+            raise TypeError(f"Unsupported formats for '{name}': {sorted(bad_formats)}")
+        jobs.append((name, figure, figure_formats))
+
+    if shared_plotlyjs and any(isinstance(job[1], str) and "html" in job[2] for job in jobs):
+        # written once here so parallel workers never copy the bundle over each other
+        bundle = output_folder / "plotly.min.js"
+        if not bundle.exists():
+            bundle.write_text(get_plotlyjs(), encoding="utf-8")
+
+    start = time.perf_counter()
+    if max_workers == 1:
+        results = [
+            _export_figure(name, figure, figure_formats, output_folder, shared_plotlyjs)
+            for name, figure, figure_formats in jobs
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _export_figure, name, figure, figure_formats, output_folder, shared_plotlyjs
+                )
+                for name, figure, figure_formats in jobs
+            ]
+            results = [future.result() for future in futures]
+
+    timings = pd.DataFrame(
+        [record for records in results for record in records],
+        columns=["name", "format", "path", "seconds", "bytes", "pid", "error"],
+    )
+    failed = timings["error"].notna().sum()
+    print(
+        f"Exported {len(timings) - failed} files in {time.perf_counter() - start:.2f}s"
+        + (f", {failed} failed" if failed else "")
+    )
+    return timings
@@ -0,0 +1,93 @@
+import pandas as pd
+
+
+class RollupCube:
+    def __init__(self, groupings, measures=()):
+        """Cached aggregate tables for chosen combinations of dimension columns.
+
+        Each table holds, per combination of dimension values, the number of rows and the sum and
+        non-missing count of every measure column. These are additive, so a table for fewer
+        dimensions can be rolled up from a larger one and appended rows update the tables in place.
+
+        Args:
+            groupings (list): Dimension combinations to precompute, e.g.
+                              [('Review Submit Month', 'Star Rating'), ('Ordinal App Version Number',)].
+            measures (list, optional): Numeric columns to keep sums and counts of, e.g. ['Star Rating'].
+        """
+        self.groupings = [tuple(grouping) for grouping in groupings]
+        self.measures = list(measures)
+        self.tables = {}
+
+    def __aggregate(self, df, grouping):
+        aggregations = {"rows": (grouping[0], "size")}
+        for measure in self.measures:
+            aggregations[f"{measure}_sum"] = (measure, "sum")
+            aggregations[f"{measure}_count"] = (measure, "count")
+        return df.groupby(list(grouping), dropna=False, observed=True).agg(**aggregations)
+
+    @staticmethod
+    def __combine(tables, grouping):
+        # re-aggregating by every level adds up the rows that have the same dimension values
+        return (
+            pd.concat(tables)
+            .groupby(level=list(range(len(grouping))), dropna=False, observed=True)
+            .sum()
+        )
+
+    def build(self, df):
+        """Computes every table from the rows of df, replacing any previous tables."""
+        self.tables = {grouping: self.__aggregate(df, grouping) for grouping in self.groupings}
+        return self
+
+    def append(self, new_rows):
+        """Adds the aggregates of rows appended to the data without recomputing the old rows."""
+        for grouping, table in self.tables.items():
+            self.tables[grouping] = self.__combine(
+                [table, self.__aggregate(new_rows, grouping)], grouping
+            )
+        return self
+
+    def add_grouping(self, df, grouping):
+        """Computes and caches the table for one more dimension combination."""
+        grouping = tuple(grouping)
+        if grouping not in self.groupings:
+            self.groupings.append(grouping)
+        self.tables[grouping] = self.__aggregate(df, grouping)
+        return self.tables[grouping]
+
+    def table(self, dimensions):
+        """Returns the aggregate table for the dimensions, or None if it cannot be served from the cube.
+
+        An exact table is returned as is. Otherwise the smallest cached table over a superset of the
+        dimensions is rolled up to them.
+
+        Args:
+            dimensions (list): Dimension columns, e.g. ['Review Submit Month', 'Star Rating'].
+
+        Returns:
+            pd.DataFrame: Indexed by the dimensions, with a rows column, the <measure>_sum and
+                          <measure>_count columns and <measure>_mean.
+        """
+        dimensions = tuple(dimensions)
+        table = self.tables.get(dimensions)
+        if table is None:
+            supersets = [
+                table
+                for grouping, table in self.tables.items()
+                if set(dimensions) <= set(grouping)
+            ]
+            if not supersets:
+                return None
+            table = min(supersets, key=len)
+            table = table.groupby(
+                level=list(dimensions), dropna=False, observed=True
+            ).sum()
+        table = table.copy()
+        for measure in self.measures:
+            table[f"{measure}_mean"] = table[f"{measure}_sum"] / table[f"{measure}_count"]
+        return table
+
+    def counts(self, column):
+        """Returns the number of rows per value of column (NaN included), or None if not in the cube."""
+        table = self.table([column])
+        return None if table is None else table["rows"]
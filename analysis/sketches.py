@@ -0,0 +1,316 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class HyperLogLog:
+    def __init__(self, precision=12):
+        """Estimates the number of distinct values using 2**precision one-byte registers.
+
+        The relative standard error is about 1.04 / sqrt(2**precision), i.e. 1.6% at the default.
+        """
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        """Adds an array of uint64 hashes."""
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # rank = position of the first 1-bit in the remaining 64 - p bits (frexp gives the bit length)
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - p + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        self.registers = np.maximum(self.registers, other.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            # linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return raw
+
+
+class QuantileSketch:
+    def __init__(self, k=256, seed=0):
+        """A KLL-style quantile sketch keeping at most about k values per level.
+
+        Values at level i stand for 2**i original values. When a level holds more than k values
+        it is sorted and every other value (from a random offset) is promoted to the next level.
+        """
+        self.k = k
+        self.levels = [np.array([], dtype=np.float64)]
+        self.rng = np.random.default_rng(seed)
+
+    def __compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                leftover = items[: len(items) % 2]
+                paired = items[len(items) % 2 :]
+                promoted = paired[self.rng.integers(2) :: 2]
+                self.levels[level] = leftover
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.array([], dtype=np.float64))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """Adds an array of float values without NaN."""
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.__compress()
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.array([], dtype=np.float64))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.__compress()
+
+    def quantiles(self, qs):
+        values = np.concatenate(self.levels)
+        if len(values) == 0:
+            return [np.nan for _ in qs]
+        weights = np.concatenate(
+            [np.full(len(items), 2.0**level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1])
+        return values[np.minimum(positions, len(values) - 1)].tolist()
+
+
+class HeavyHitters:
+    def __init__(self, capacity=1000):
+        """A mergeable Misra-Gries summary of the most frequent values.
+
+        Keeps at most capacity counters. Each estimated count is at most the true count and at
+        least the true count minus self.error, where self.error <= total / (capacity + 1).
+        """
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.total = 0
+        self.error = 0
+
+    def __merge_counts(self, counts):
+        combined = self.counts.add(counts, fill_value=0).astype(np.int64)
+        if len(combined) > self.capacity:
+            combined = combined.sort_values(ascending=False)
+            threshold = combined.iloc[self.capacity]
+            combined = combined.iloc[: self.capacity] - threshold
+            combined = combined[combined > 0]
+            self.error += threshold
+        self.counts = combined
+
+    def update(self, values):
+        """Adds a Series of non-null values."""
+        self.total += len(values)
+        self.__merge_counts(values.value_counts())
+
+    def merge(self, other):
+        self.total += other.total
+        self.error += other.error
+        self.__merge_counts(other.counts)
+
+    def is_exact(self):
+        return self.error == 0
+
+
+class ColumnSketch:
+    def __init__(self, memory_cap=1_000_000):
+        """Bounded-memory, mergeable statistics for one column.
+
+        Args:
+            memory_cap (int, optional): Approximate bytes to spend on the column: a quarter on the
+                                        distinct count, a quarter on the quantiles and half on the
+                                        most frequent values. Default is 1 MB.
+        """
+        precision = int(np.clip(math.floor(math.log2(memory_cap / 4)), 4, 18))
+        self.distinct = HyperLogLog(precision)
+        # about 20 levels of 8 byte values
+        self.quantile_sketch = QuantileSketch(k=max(32, memory_cap // 4 // 160))
+        # about 100 bytes per counter once the pandas index and the value are included
+        self.heavy_hitters = HeavyHitters(capacity=max(10, memory_cap // 2 // 100))
+        self.dtype = None
+        self.rows = 0
+        self.nan_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def __is_numeric(self):
+        return pd.api.types.is_numeric_dtype(self.dtype)
+
+    def __has_range(self):
+        return self.__is_numeric() or pd.api.types.is_datetime64_any_dtype(self.dtype)
+
+    def __update_moments(self, count, mean, m2):
+        # Chan et al. parallel update of the mean and sum of squared differences
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.count * count / total
+
+    @property
+    def count(self):
+        return self.rows - self.nan_count
+
+    def update(self, col):
+        """Adds a chunk of the column (a pd.Series)."""
+        if self.dtype is None:
+            self.dtype = col.dtype
+        values = col.dropna()
+
+        if len(values):
+            self.distinct.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+            self.heavy_hitters.update(values)
+            if self.__is_numeric():
+                numbers = values.to_numpy(dtype=np.float64)
+                self.__update_moments(
+                    len(numbers), numbers.mean(), ((numbers - numbers.mean()) ** 2).sum()
+                )
+                self.quantile_sketch.update(numbers)
+            if self.__has_range():
+                self.min = values.min() if self.min is None else min(self.min, values.min())
+                self.max = values.max() if self.max is None else max(self.max, values.max())
+
+        self.rows += len(col)
+        self.nan_count += len(col) - len(values)
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another sketch of the same column, e.g. from another file."""
+        if self.dtype is None:
+            self.dtype = other.dtype
+        if other.count:
+            self.__update_moments(other.count, other.mean, other.m2)
+        self.distinct.merge(other.distinct)
+        self.quantile_sketch.merge(other.quantile_sketch)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        self.rows += other.rows
+        self.nan_count += other.nan_count
+        return self
+
+    def summary(self):
+        """Returns the statistics under the same names as Visualisation.describe_columns."""
+        hitters = self.heavy_hitters
+        if hitters.is_exact():
+            # every distinct value is still counted, so the counts are exact
+            uniques_wo_na = len(hitters.counts)
+        else:
+            uniques_wo_na = max(int(round(self.distinct.estimate())), len(hitters.counts))
+        counts = hitters.counts.sort_values(ascending=False)
+        proportions_with_na = (counts / self.rows).to_dict() if self.rows else {}
+        if self.nan_count:
+            proportions_with_na[np.nan] = self.nan_count / self.rows
+
+        stats = {
+            "count_of_entries_wo_na": self.count,
+            "nan_count": self.nan_count,
+            "count_of_uniques_with_na": uniques_wo_na + (1 if self.nan_count else 0),
+            "count_of_uniques_wo_na": uniques_wo_na,
+            "proportion_count_with_na": proportions_with_na,
+            "proportion_count_wo_na": (counts / self.count).to_dict() if self.count else {},
+            "min": pd.NA if self.min is None else self.min,
+            "max": pd.NA if self.max is None else self.max,
+        }
+        if self.__is_numeric():
+            quartiles = self.quantile_sketch.quantiles([0.25, 0.5, 0.75])
+            stats.update(
+                {
+                    "mean": self.mean if self.count else np.nan,
+                    "std": math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan,
+                    "25%": quartiles[0],
+                    "50%": quartiles[1],
+                    "75%": quartiles[2],
+                }
+            )
+        return stats
+
+
+class FrameSketch:
+    def __init__(self, memory_cap=1_000_000):
+        """Mergeable ColumnSketches for every column of a DataFrame, or of a dataset read in chunks.
+
+        Args:
+            memory_cap (int, optional): Approximate bytes per column. Default is 1 MB.
+        """
+        self.memory_cap = memory_cap
+        self.columns = {}
+
+    def update(self, df):
+        """Adds a DataFrame (or one chunk of a larger dataset)."""
+        for column in df.columns:
+            if column not in self.columns:
+                self.columns[column] = ColumnSketch(self.memory_cap)
+            self.columns[column].update(df[column])
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another FrameSketch, e.g. built from another file."""
+        for column, sketch in other.columns.items():
+            if column in self.columns:
+                self.columns[column].merge(sketch)
+            else:
+                self.columns[column] = sketch
+        return self
+
+    def to_frame(self):
+        """Returns the summary in the schema of Visualisation.describe_columns."""
+        rows = []
+        for column, sketch in self.columns.items():
+            row = {
+                "column_name": column,
+                "data_type": sketch.dtype,
+                "count_of_entries_with_na": sketch.rows,
+            }
+            row.update(sketch.summary())
+            rows.append(row)
+        fields = [
+            "column_name",
+            "data_type",
+            "count_of_entries_with_na",
+            "count_of_entries_wo_na",
+            "nan_count",
+            "count_of_uniques_with_na",
+            "count_of_uniques_wo_na",
+            "proportion_count_with_na",
+            "proportion_count_wo_na",
+            "mean",
+            "std",
+            "min",
+            "25%",
+            "50%",
+            "75%",
+            "max",
+        ]
+        return pd.DataFrame(rows, columns=fields)
+
+
+def describe_chunks(chunks, memory_cap=1_000_000):
+    """Approximately describes a dataset that does not fit in memory.
+
+    Args:
+        chunks (iterable): DataFrame chunks, e.g. pd.read_csv(path, chunksize=100_000).
+        memory_cap (int, optional): Approximate bytes per column. Default is 1 MB.
+
+    Returns:
+        pd.DataFrame: The summary in the schema of Visualisation.describe_columns.
+    """
+    sketch = FrameSketch(memory_cap)
+    for chunk in chunks:
+        sketch.update(chunk)
+    return sketch.to_frame()
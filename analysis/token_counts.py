@@ -0,0 +1,81 @@
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+import pandas as pd
+
+# the same pattern WordCloud uses to split text into words
+TOKEN_PATTERN = re.compile(r"\w[\w']+")
+
+
+def tokenize(text):
+    """Splits a piece of text into lowercase words the way WordCloud does.
+
+    Possessive 's endings are dropped and words made only of digits are skipped.
+    """
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token.endswith("'s"):
+            token = token[:-2]
+        if not token.isdigit():
+            yield token
+
+
+def _count_chunk(texts, excluded):
+    counts = Counter()
+    for text in texts:
+        if isinstance(text, str):
+            counts.update(token for token in tokenize(text) if token not in excluded)
+    return counts
+
+
+def iter_chunks(texts, chunk_size):
+    """Yields lists of up to chunk_size texts."""
+    iterator = iter(texts)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def merge_plurals(counts):
+    """Adds the count of 'words' to 'word' when both appear, as WordCloud does with normalize_plurals."""
+    merged = Counter(counts)
+    for word, count in counts.items():
+        if word.endswith("s") and not word.endswith("ss") and word[:-1] in counts:
+            merged[word[:-1]] += count
+            del merged[word]
+    return merged
+
+
+def count_tokens(texts, excluded_words=(), processes=None, chunk_size=10_000):
+    """Counts the words in a column of text without building one long string.
+
+    Args:
+        texts (iterable): The texts, e.g. a DataFrame column. Missing values are skipped.
+        excluded_words (iterable, optional): Words (compared in lowercase) that are not counted,
+                                             e.g. stopwords and words to remove from a word cloud.
+        processes (int, optional): Number of worker processes to tokenize chunks of texts in
+                                   parallel. Default is None, which tokenizes in this process.
+        chunk_size (int, optional): Number of texts sent to a worker at a time. Default is 10,000.
+
+    Returns:
+        Counter: word -> number of occurrences.
+    """
+    excluded = frozenset(word.lower() for word in excluded_words)
+    if processes is None or processes == 1:
+        counts = _count_chunk(texts, excluded)
+    else:
+        counts = Counter()
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for chunk_counts in executor.map(
+                _count_chunk, iter_chunks(texts, chunk_size), repeat(excluded)
+            ):
+                counts.update(chunk_counts)
+    return merge_plurals(counts)
+
+
+def default_processes(texts, parallel_threshold=200_000):
+    """Returns one process per core for columns of at least parallel_threshold texts, otherwise None."""
+    if isinstance(texts, pd.Series) and len(texts) >= parallel_threshold:
+        return os.cpu_count()
+    return None
@@ -0,0 +1,180 @@
+import hashlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analysis.token_counts import iter_chunks, merge_plurals, tokenize
+
+
+def _index_chunk(texts):
+    """Tokenizes texts into CSR arrays over a vocabulary local to the chunk."""
+    vocabulary = {}
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        if isinstance(text, str):
+            for token, count in Counter(tokenize(text)).items():
+                indices.append(vocabulary.setdefault(token, len(vocabulary)))
+                data.append(count)
+        indptr.append(len(indices))
+    return list(vocabulary), indptr, indices, data
+
+
+def column_fingerprint(texts):
+    """A hash of the values of a text column, to check a saved index was built from the same texts."""
+    hashes = pd.util.hash_pandas_object(pd.Series(list(texts), dtype=object), index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+class TokenIndex:
+    def __init__(self, matrix, vocabulary, fingerprint=None):
+        """A document-term matrix of a text column, for word counts of any subset of rows.
+
+        Use TokenIndex.build to create one from a column, or TokenIndex.load to read a saved one.
+
+        Args:
+            matrix (scipy.sparse.csr_matrix): Counts with one row per document and one column per word.
+            vocabulary (list): The word of each matrix column.
+            fingerprint (str, optional): column_fingerprint of the texts the index was built from.
+        """
+        self.matrix = matrix
+        self.vocabulary = list(vocabulary)
+        self.fingerprint = fingerprint
+        self._vocabulary_ids = {word: i for i, word in enumerate(self.vocabulary)}
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @classmethod
+    def build(cls, texts, processes=None, chunk_size=10_000):
+        """Tokenizes every text once. Missing values become empty documents.
+
+        Args:
+            texts (iterable): The texts, e.g. a DataFrame column.
+            processes (int, optional): Number of worker processes to tokenize chunks of texts in
+                                       parallel. Default is None, which tokenizes in this process.
+            chunk_size (int, optional): Number of texts tokenized at a time. Default is 10,000.
+        """
+        if not isinstance(texts, pd.Series):
+            # read twice, for the chunks and the fingerprint
+            texts = list(texts)
+        chunks = iter_chunks(texts, chunk_size)
+        if processes is None or processes == 1:
+            index = cls.__from_chunks(map(_index_chunk, chunks))
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                index = cls.__from_chunks(executor.map(_index_chunk, chunks))
+        index.fingerprint = column_fingerprint(texts)
+        return index
+
+    @classmethod
+    def __from_chunks(cls, results):
+        vocabulary = {}
+        indptr, indices, data = [np.zeros(1, dtype=np.int64)], [], []
+        for chunk_vocabulary, chunk_indptr, chunk_indices, chunk_data in results:
+            # map the chunk's word ids onto the shared vocabulary
+            mapping = np.array(
+                [vocabulary.setdefault(word, len(vocabulary)) for word in chunk_vocabulary],
+                dtype=np.int64,
+            )
+            indptr.append(np.asarray(chunk_indptr[1:], dtype=np.int64) + indptr[-1][-1])
+            indices.append(mapping[np.asarray(chunk_indices, dtype=np.int64)])
+            data.append(np.asarray(chunk_data, dtype=np.int32))
+        indptr = np.concatenate(indptr)
+        matrix = sparse.csr_matrix(
+            (
+                np.concatenate(data) if data else np.zeros(0, dtype=np.int32),
+                np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+                indptr,
+            ),
+            shape=(len(indptr) - 1, len(vocabulary)),
+        )
+        return cls(matrix, vocabulary)
+
+    def __kept_words(self, excluded_words):
+        kept = np.ones(len(self.vocabulary), dtype=bool)
+        ids = [self._vocabulary_ids.get(word.lower()) for word in excluded_words]
+        kept[[i for i in ids if i is not None]] = False
+        return kept
+
+    def __to_counter(self, ids, totals, kept):
+        keep = (totals > 0) & kept[ids]
+        return merge_plurals(
+            dict(zip([self.vocabulary[i] for i in ids[keep]], totals[keep].tolist()))
+        )
+
+    def frequencies(self, mask=None, excluded_words=()):
+        """Returns the word counts of the rows selected by mask.
+
+        Args:
+            mask (array-like of bool, optional): One value per document. Default is None, i.e. all rows.
+            excluded_words (iterable, optional): Words (compared in lowercase) left out of the counts.
+
+        Returns:
+            Counter: word -> number of occurrences.
+        """
+        if mask is None:
+            totals = np.asarray(self.matrix.sum(axis=0)).ravel()
+        else:
+            mask = np.asarray(mask, dtype=bool)
+            if len(mask) != len(self):
+                raise ValueError(f"mask has {len(mask)} values but the index has {len(self)} documents")
+            totals = self.matrix.T @ mask.astype(np.int64)
+        ids = np.arange(len(self.vocabulary))
+        return self.__to_counter(ids, totals, self.__kept_words(excluded_words))
+
+    def frequencies_by(self, keys, excluded_words=()):
+        """Returns the word counts of each group of rows, in one sparse product.
+
+        Args:
+            keys (array-like): The group of each document, e.g. df['rating']. Rows with a missing
+                               key are left out.
+            excluded_words (iterable, optional): Words (compared in lowercase) left out of the counts.
+
+        Returns:
+            dict: group -> Counter of word counts.
+        """
+        codes, groups = pd.factorize(np.asarray(keys), sort=True)
+        if len(codes) != len(self):
+            raise ValueError(f"keys has {len(codes)} values but the index has {len(self)} documents")
+        rows = np.flatnonzero(codes >= 0)
+        indicator = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (codes[rows], rows)),
+            shape=(len(groups), len(self)),
+        )
+        totals = (indicator @ self.matrix).tocsr()
+        kept = self.__kept_words(excluded_words)
+        return {
+            group: self.__to_counter(
+                totals.indices[totals.indptr[i] : totals.indptr[i + 1]],
+                totals.data[totals.indptr[i] : totals.indptr[i + 1]],
+                kept,
+            )
+            for i, group in enumerate(groups)
+        }
+
+    def save(self, path):
+        """Writes the index to a single .npz file."""
+        np.savez_compressed(
+            path,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.asarray(self.matrix.shape),
+            vocabulary=np.asarray(self.vocabulary, dtype=str),
+            fingerprint=np.asarray(self.fingerprint or ""),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Reads an index written by save."""
+        with np.load(path) as arrays:
+            matrix = sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=tuple(arrays["shape"]),
+            )
+            # files saved before fingerprints were added have none
+            fingerprint = str(arrays["fingerprint"]) if "fingerprint" in arrays else ""
+            return cls(matrix, arrays["vocabulary"].tolist(), fingerprint or None)
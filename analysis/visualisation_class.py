@@ -7,12 +7,94 @@ from plotly.subplots import make_subplots
 from wordcloud import WordCloud, ImageColorGenerator, STOPWORDS
 import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from src import ukhsa_colours as uc
+from analysis.backends import make_backend
+from analysis.downsampling import downsample_line
+from analysis.rollup import RollupCube
+from analysis.sketches import FrameSketch
+from analysis.token_counts import count_tokens, default_processes
+from analysis.token_index import TokenIndex, column_fingerprint
+from src.frame_versions import frame_version
+from src.instrumentation import instrumented
+
+
+_DESCRIBE_FIELDS = [
+    "count_of_entries_wo_na",
+    "nan_count",
+    "count_of_uniques_with_na",
+    "count_of_uniques_wo_na",
+    "proportion_count_with_na",
+    "proportion_count_wo_na",
+    "mean",
+    "std",
+    "min",
+    "25%",
+    "50%",
+    "75%",
+    "max",
+]
 
 
 class Visualisation:
-    def __init__(self, df):
-        self.df = df
+    def __init__(self, df, instrumentation=None, headless=False, backend="pandas"):
+        """
+        Args:
+            df (pd.DataFrame): The DataFrame to describe and plot. With the polars backend this can also
+                               be the path or glob of Parquet files (or a Polars LazyFrame), scanned
+                               lazily; self.df is then None and only describe_columns,
+                               plot_count_and_proportion and custom_graph(df=None) can be used.
+            instrumentation (Instrumentation, optional): Records the time, rows and memory of
+                                                         each method call (see src.instrumentation).
+            headless (bool, optional): Return figures from the plotting methods instead of showing them,
+                                       e.g. to write them to files with analysis.export.export_figures.
+                                       Default is False.
+            backend (str, optional): Engine for the aggregations behind describe_columns,
+                                     plot_count_and_proportion and custom_graph: 'pandas' (default) or
+                                     'polars' (multi-threaded, over Arrow data). Both give the same results.
+        """
+        self.df = df if isinstance(df, pd.DataFrame) else None
+        self.instrumentation = instrumentation
+        self.headless = headless
+        self.backend = backend
+        self._backend = make_backend(df, backend)
+        # text column -> TokenIndex, see build_token_index, and the frame state each was built for
+        self.token_indexes = {}
+        self._token_index_versions = {}
+        # cached aggregate tables, see build_rollup, and the frame state they were built for
+        self.rollup = None
+        self._rollup_version = None
+        # results of describe_columns and value counts for the current version of self.df
+        self._results = {}
+        self._results_version = None
+
+    def __backend(self):
+        # rebuilt whenever self.df has been replaced, e.g. by append_rows
+        if self.df is not None and self._backend.source is not self.df:
+            self._backend = make_backend(self.df, self.backend)
+        return self._backend
+
+    def __frame_state(self):
+        # the shape and column names also catch changes made outside PreProcessing, like appends
+        return (frame_version(self.df), len(self.df), tuple(self.df.columns))
+
+    def __cached(self, name, columns, params, compute):
+        if self.df is None:
+            # Parquet scans are read-only, but have no version to key a cache on
+            return compute()
+        version = self.__frame_state()
+        if version != self._results_version:
+            self._results = {}
+            self._results_version = version
+        key = (name, tuple(columns), params)
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key]
+
+    def clear_cache(self):
+        """Forget the cached results of describe_columns and plot_count_and_proportion."""
+        self._results = {}
+        self._results_version = None
 
     def __apply_custom_color_scale(self, fig):
         custom_color_scale = []
@@ -28,13 +110,27 @@ class Visualisation:
             elif hasattr(trace, "color"):
                 trace.color = custom_color_scale[i % len(custom_color_scale)]
 
-    def describe_columns(self):
+    @instrumented
+    def describe_columns(
+        self, max_workers=1, use_processes=False, approximate=False, memory_cap=1_000_000
+    ):
         # can i get rid of this and keep the autoeda for dataprep/sweetviz
         """
         Generate a descriptive summary for the given DataFrame.
 
         Args:
             df (pd.DataFrame): The input DataFrame to be summarized.
+            max_workers (int, optional): Number of columns summarised at the same time on a thread pool,
+                or None for one per core. Default is 1, one column after another, because building the
+                proportion dicts holds the GIL; a pool mainly helps wide frames of numeric columns.
+            use_processes (bool, optional): Use a process pool instead of a thread pool. Each column and its
+                proportion dicts are then copied between processes. Default is False.
+            approximate (bool, optional): Use bounded-memory sketches instead of exact counts: HyperLogLog
+                distinct counts, KLL-style quantiles and the most frequent values only in the proportion
+                dicts (exact when a column has fewer distinct values than fit in memory_cap). The same
+                sketches can be merged across chunks and files, see analysis.sketches.describe_chunks.
+                Default is False.
+            memory_cap (int, optional): Approximate bytes per column for the approximate mode. Default is 1 MB.
 
         Returns:
             pd.DataFrame: A DataFrame containing various descriptive statistics for the columns.
@@ -64,50 +160,59 @@ class Visualisation:
                 - '75%': 75th percentile for numeric columns.
                 - 'max': Maximum value for numeric and datetime columns, NaN for non-numeric columns.
 
+            Each column is summarised in a single pass: one value_counts gives the counts, NaN count, unique
+            counts and both sets of proportions, and one quantile call gives all three percentiles.
+            With the polars backend every column's queries run as one multi-threaded batch and
+            max_workers / use_processes are ignored.
+
+            The result is cached until self.df changes: PreProcessing methods bump the frame's version
+            (see src.frame_versions), and new rows or columns are noticed too. Call
+            src.frame_versions.bump_version(df) after changing values of the frame in place yourself.
+            The rollup tables (build_rollup) and token indexes (build_token_index) follow the same
+            version and are rebuilt on their next use after a change.
+
             Note:
             - The function differentiates numeric and datetime columns from non-numeric columns based on data types.
             - The function assumes that columns with datetime data type are of type 'datetime64', 'datetime', or 'timedelta'.
         """
+        columns = [] if self.df is None else list(self.df.columns)
+        self.column_info_df = self.__cached(
+            "describe_columns",
+            columns,
+            (approximate, memory_cap),
+            lambda: self.__describe_columns(max_workers, use_processes, approximate, memory_cap),
+        )
+        return self.column_info_df
+
+    def __describe_columns(self, max_workers, use_processes, approximate, memory_cap):
+        if approximate:
+            # both backends hand over the rows in batches, so memory stays bounded
+            sketch = FrameSketch(memory_cap)
+            for batch in self.__backend().batches():
+                sketch.update(batch)
+            return sketch.to_frame()
+
+        backend = self.__backend()
+        stats = backend.describe_columns(max_workers=max_workers, use_processes=use_processes)
         column_info_dict = {
-            "data_type": self.df.dtypes,
-            "count_of_entries_with_na": self.df.shape[0],
-            "count_of_entries_wo_na": self.df.count(),
-            "nan_count": self.df.isnull().sum(),
-            "count_of_uniques_with_na": self.df.nunique(dropna=False),
-            "count_of_uniques_wo_na": self.df.nunique(dropna=True),
-            "proportion_count_with_na": self.df.apply(
-                lambda col: col.value_counts(normalize=True, dropna=False).to_dict()
-            ),
-            "proportion_count_wo_na": self.df.apply(
-                lambda col: col.value_counts(normalize=True, dropna=True).to_dict()
-            ),
-            "mean": self.df.mean(numeric_only=True),
-            "std": self.df.std(numeric_only=True),
-            "min": self.df.apply(
-                lambda col: col.min()
-                if pd.api.types.is_numeric_dtype(col)
-                or pd.api.types.is_datetime64_any_dtype(col)
-                else pd.NA
-            ),
-            "25%": self.df.quantile(0.25, numeric_only=True),
-            "50%": self.df.quantile(0.50, numeric_only=True),
-            "75%": self.df.quantile(0.75, numeric_only=True),
-            "max": self.df.apply(
-                lambda col: col.max()
-                if pd.api.types.is_numeric_dtype(col)
-                or pd.api.types.is_datetime64_any_dtype(col)
-                else pd.NA
+            "data_type": backend.dtypes(
+                {column: stat["nan_count"] for column, stat in stats.items()}
             ),
+            "count_of_entries_with_na": backend.n_rows,
         }
-        self.column_info_df = (
+        for name in _DESCRIBE_FIELDS:
+            column_info_dict[name] = pd.Series(
+                {column: stat[name] for column, stat in stats.items() if name in stat},
+                dtype=object if name in ("min", "max") else None,
+            )
+        return (
             pd.DataFrame(column_info_dict)
             .reset_index()
             .rename(columns={"index": "column_name"})
         )
 
-        return self.column_info_df
-
-    def plot_count_and_proportion(self, columns, dropna=False):
+    @instrumented
+    def plot_count_and_proportion(self, columns, dropna=False, combined=False, show=None):
         """
         Plot interactive bar charts showing the count and proportion of specified columns in a DataFrame using Plotly.
 
@@ -122,38 +227,31 @@ class Visualisation:
                 If True, NaN values will be excluded from the calculations and the plots.
                 If False, NaN values will be included in the calculations and displayed as a separate category 'missing' in the plots.
 
+            combined (bool, optional): Whether to draw every column in one figure, one row of subplots per column. Default is False.
+
+            show (bool, optional): Whether to display the figures. Default is None, which shows them
+                unless the Visualisation is headless.
+
         Returns:
             None
                 This function displays interactive bar charts using Plotly to visualize the count and proportion of values in the specified columns.
+            If show is False, the figures are returned instead: a list with one figure per column,
+            or the single combined figure.
         """
         if not isinstance(columns, list):
             raise TypeError("columns should be a list.")
+        if show is None:
+            show = not self.headless
 
-        for column in columns:
-            # Copy the DataFrame to avoid modifying the original data
-
-            data_filled = self.df.copy()
-
-            # Calculate and sort the count and proportion values
-            count_values = data_filled[column].value_counts(dropna=dropna).sort_index()
-            proportion_values = (
-                data_filled[column]
-                .value_counts(normalize=True, dropna=dropna)
-                .sort_index()
-            )
-
-            # Replace NaN / NaT with 'missing' and Convert the index to strings for non-numeric columns (to handle NaN values)
-            if not dropna:
-                na_fill_value = "missing"
-                count_values.index = count_values.index.fillna(na_fill_value).astype(
-                    str
-                )
-                proportion_values.index = proportion_values.index.fillna(
-                    na_fill_value
-                ).astype(str)
+        figures = []
+        fig = make_subplots(rows=len(columns), cols=2) if combined else None
+        for row, column in enumerate(columns, start=1):
+            count_values, proportion_values = self.__count_and_proportion(column, dropna)
 
-            # Create subplots with 1 row and 2 columns
-            fig = make_subplots(rows=1, cols=2)
+            if not combined:
+                # Create subplots with 1 row and 2 columns
+                fig = make_subplots(rows=1, cols=2)
+                row = 1
 
             # Add count bar chart to the first column
             fig.add_trace(
@@ -163,7 +261,7 @@ class Visualisation:
                     name=f"Count ({column})",
                     showlegend=False,
                 ),
-                row=1,
+                row=row,
                 col=1,
             )
 
@@ -175,29 +273,137 @@ class Visualisation:
                     name=f"Proportion ({column})",
                     showlegend=False,
                 ),
-                row=1,
+                row=row,
                 col=2,
             )
 
             # Set subtitles for each subplot
-            fig.update_xaxes(title_text=f"{column}", row=1, col=1)
-            fig.update_yaxes(title_text="Count", row=1, col=1)
-            fig.update_xaxes(title_text=f"{column}", row=1, col=2)
-            fig.update_yaxes(title_text="Proportion", row=1, col=2)
+            fig.update_xaxes(title_text=f"{column}", row=row, col=1)
+            fig.update_yaxes(title_text="Count", row=row, col=1)
+            fig.update_xaxes(title_text=f"{column}", row=row, col=2)
+            fig.update_yaxes(title_text="Proportion", row=row, col=2)
+
+            if not combined:
+                figures.append(
+                    self.__finish_count_and_proportion(
+                        fig, f"Counts and Proportions of {column}", 400, dropna
+                    )
+                )
 
-            # Update layout
-            fig.update_layout(title=f"Counts and Proportions of {column}", height=400)
+        if combined:
+            figures.append(
+                self.__finish_count_and_proportion(
+                    fig, "Counts and Proportions", 400 * len(columns), dropna
+                )
+            )
 
-            if not dropna:
-                fig.update_xaxes(type="category")
+        if show:
+            for fig in figures:
+                fig.show()
+            return
+        return figures[0] if combined else figures
+
+    def __count_and_proportion(self, column, dropna):
+        rollup = self.__current_rollup()
+        count_values = rollup.counts(column) if rollup is not None else None
+        if count_values is None:
+            # a single value_counts on the column, with no copy of the DataFrame
+            count_values = self.__cached(
+                "value_counts",
+                [column],
+                dropna,
+                lambda: self.__backend().value_counts(column, dropna),
+            ).copy()
+        else:
+            if dropna:
+                count_values = count_values[count_values.index.notna()]
+            count_values = count_values[count_values > 0].sort_index()
+        proportion_values = count_values / count_values.sum()
+
+        # Replace NaN / NaT with 'missing' and Convert the index to strings for non-numeric columns (to handle NaN values)
+        if not dropna:
+            na_fill_value = "missing"
+            count_values.index = count_values.index.fillna(na_fill_value).astype(str)
+            proportion_values.index = count_values.index
+        return count_values, proportion_values
 
-            self.__apply_custom_color_scale(fig)
+    def __finish_count_and_proportion(self, fig, title, height, dropna):
+        # Update layout
+        fig.update_layout(title=title, height=height)
 
-            fig.show()
+        if not dropna:
+            fig.update_xaxes(type="category")
 
-        # Show the figure
-        return
+        self.__apply_custom_color_scale(fig)
+        return fig
+
+    @instrumented
+    def build_rollup(self, groupings, measures=()):
+        """
+        Precompute and cache aggregate tables (row counts, and sums and counts of measures) for
+        combinations of dimension columns. plot_count_and_proportion, custom_graph(df=None) and
+        rollup_table then read these small tables instead of the raw rows.
+        Rows added with append_rows are added to the tables; any other change to self.df (a new
+        version, see describe_columns) rebuilds them from the rows on their next use.
 
+        Args:
+            groupings (list): Dimension combinations, e.g.
+                [('Review Submit Month', 'Binary Rating'), ('Ordinal App Version Number', 'Star Rating')].
+                A table also serves any subset of its dimensions.
+            measures (list, optional): Numeric columns to aggregate, e.g. ['Star Rating'].
+
+        Returns:
+            RollupCube: The cube, also kept in self.rollup.
+        """
+        self.rollup = RollupCube(groupings, measures).build(self.df)
+        self._rollup_version = self.__frame_state()
+        return self.rollup
+
+    def __current_rollup(self):
+        # changes to self.df other than append_rows (e.g. a cleaning step) make the tables stale
+        if self.rollup is not None and self._rollup_version != self.__frame_state():
+            print("The rollup tables no longer match the DataFrame, rebuilding them")
+            self.rollup.build(self.df)
+            self._rollup_version = self.__frame_state()
+        return self.rollup
+
+    def rollup_table(self, dimensions):
+        """
+        Return the aggregate table for a combination of dimension columns, computing and caching it
+        from self.df if the cube cannot serve it yet.
+
+        Args:
+            dimensions (list): Dimension columns, e.g. ['Review Submit Month', 'Star Rating'].
+
+        Returns:
+            pd.DataFrame: One row per combination of values, with the dimensions as columns and a
+                'rows' column, plus '<measure>_sum', '<measure>_count' and '<measure>_mean' columns.
+        """
+        if self.rollup is None:
+            self.rollup = RollupCube([])
+            self._rollup_version = self.__frame_state()
+        table = self.__current_rollup().table(dimensions)
+        if table is None:
+            self.rollup.add_grouping(self.df, dimensions)
+            table = self.rollup.table(dimensions)
+        return table.reset_index()
+
+    @instrumented
+    def append_rows(self, new_rows):
+        """
+        Append rows to self.df and add them to the cached aggregate tables without recomputing
+        them from the old rows.
+
+        Args:
+            new_rows (pd.DataFrame): Rows with the same columns as self.df.
+        """
+        rollup = self.__current_rollup()
+        self.df = pd.concat([self.df, new_rows], ignore_index=True)
+        if rollup is not None:
+            rollup.append(new_rows)
+            self._rollup_version = self.__frame_state()
+
+    @instrumented
     def custom_graph(
         self,
         df,
@@ -211,21 +417,46 @@ class Visualisation:
         graph_title=None,
         yaxis_range=None,
         xaxis_range=None,
+        max_points=5000,
+        webgl_threshold=10_000,
+        downsample="lttb",
     ):
         """
         Create a custom graph using Plotly's make_subplots with support for multiple y-axes.
 
         Parameters:
-            dataframe (pandas.DataFrame): The DataFrame containing the data.
+            dataframe (pandas.DataFrame): The DataFrame containing the data. If None and the y columns are
+                columns of self.df, the rows are read and split by z_column with the Visualisation's backend.
+                Otherwise the aggregate table for x_column (and z_column) from the rollup cube is plotted,
+                whose y columns are 'rows', '<measure>_sum', '<measure>_count' and '<measure>_mean'
+                (see build_rollup).
             x_column (str): The column name for the x-axis values.
             y_column_and_type (dict): A dictionary mapping y-column names to their chart types ('line' or 'bar').
             y_axes_title (str, optional): Title for the y-axes. If None, the y-axis titles will be set to the column names.
             barmode (str, optional): Bar mode for the bar charts. Default is 'stack'.
                 Other options are 'group' (for grouped bars) and 'overlay' (for overlaid bars).
+            max_points (int, optional): Line series with more points are downsampled to this many. Default is 5000.
+            webgl_threshold (int, optional): Line and scatter series with more points are drawn with WebGL
+                (go.Scattergl). Default is 10,000.
+            downsample (str, optional): 'lttb' (Largest-Triangle-Three-Buckets, default), 'minmax' (the
+                minimum and maximum of each bucket) or None to send every point.
 
         Returns:
-            None (displays the plot)
+            None (displays the plot), or the figure if the Visualisation is headless.
         """
+        z_groups = None
+        if df is None:
+            backend = self.__backend()
+            if set(y_column_and_type) <= set(backend.columns):
+                # raw rows: the backend reads only these columns and splits them by z_column
+                columns = [x_column] + list(y_column_and_type)
+                if z_column:
+                    z_groups = backend.partitions(columns, z_column)
+                if not z_column or xaxis_type == "category":
+                    df = backend.select(columns)
+            else:
+                df = self.rollup_table([x_column] + ([z_column] if z_column else []))
+
         if xaxis_type == "category":
             desired_output = (
                 df[x_column].sort_values(ascending=True).reset_index(drop=True)
@@ -234,21 +465,26 @@ class Visualisation:
 
         if z_column:
             fig = go.Figure()
-            for z_value in df[z_column].unique():
-                z_filtered_df = df[df[z_column] == z_value]
+            if z_groups is None:
+                # one pass to split the rows by z_value, in order of first appearance
+                z_groups = df.groupby(z_column, sort=False, observed=True)
+            for z_value, z_filtered_df in z_groups:
                 for y_column, type in y_column_and_type.items():
                     if type == "line":
+                        x, y = self.__line_points(
+                            z_filtered_df[x_column], z_filtered_df[y_column], max_points, downsample
+                        )
                         fig.add_trace(
-                            go.Scatter(
-                                x=z_filtered_df[x_column],
-                                y=z_filtered_df[y_column],
+                            self.__scatter_type(len(x), webgl_threshold)(
+                                x=x,
+                                y=y,
                                 mode="lines",
                                 name=f"{z_column}={z_value}",
                             )
                         )
                     elif type == "scatter":
                         fig.add_trace(
-                            go.Scatter(
+                            self.__scatter_type(len(z_filtered_df), webgl_threshold)(
                                 x=z_filtered_df[x_column],
                                 y=z_filtered_df[y_column],
                                 mode="markers",
@@ -274,10 +510,11 @@ class Visualisation:
             fig = make_subplots(specs=[[{"secondary_y": True}]])
             for y_column, type in y_column_and_type.items():
                 if (type == "line") & (y_axes_title is None):
+                    x, y = self.__line_points(df[x_column], df[y_column], max_points, downsample)
                     fig.add_trace(
-                        go.Scatter(
-                            x=df[x_column],
-                            y=df[y_column],
+                        self.__scatter_type(len(x), webgl_threshold)(
+                            x=x,
+                            y=y,
                             name=y_column,
                             line=dict(width=2),
                         ),
@@ -288,10 +525,11 @@ class Visualisation:
                     )  # is this when we have bars and lines?
                     # editing y axes title
                 elif (type == "line") & (y_axes_title is not None):
+                    x, y = self.__line_points(df[x_column], df[y_column], max_points, downsample)
                     fig.add_trace(
-                        go.Scatter(
-                            x=df[x_column],
-                            y=df[y_column],
+                        self.__scatter_type(len(x), webgl_threshold)(
+                            x=x,
+                            y=y,
                             name=y_column,
                             line=dict(width=2),
                         ),
@@ -323,46 +561,156 @@ class Visualisation:
             xaxis_type=xaxis_type,
         )
         self.__apply_custom_color_scale(fig)
+        if self.headless:
+            return fig
         return fig.show()
 
-    def create_wordcloud(self, text, remove_words):
+    @staticmethod
+    def __line_points(x, y, max_points, downsample):
+        if downsample is None or len(y) <= max_points:
+            return x, y
+        return downsample_line(x, y, max_points, method=downsample)
+
+    @staticmethod
+    def __scatter_type(n_points, webgl_threshold):
+        # SVG traces get slow to draw and interact with beyond a few tens of thousands of points
+        return go.Scattergl if n_points > webgl_threshold else go.Scatter
+
+    @instrumented
+    def build_token_index(self, text, processes="auto"):
         """
-            Generate and display a word cloud from a text column in a DataFrame.
+            Tokenize a text column once into a document-term matrix, so word clouds of any
+            subset of its rows (see create_wordcloud and token_frequencies_by) reuse it.
 
         Parameters:
             text (str): The name of the text column in the DataFrame.
-            remove_words (list): A list of words to remove from the word cloud.
+            processes (int, optional): Number of processes used to tokenize the column. Default 'auto' uses
+                one per core for columns of 200,000 rows or more and a single process otherwise.
 
         Returns:
-            WordCloud: A WordCloud object representing the generated word cloud.
+            TokenIndex: The index, also kept in self.token_indexes[text].
+        """
+        if processes == "auto":
+            processes = default_processes(self.df[text])
+        self.token_indexes[text] = TokenIndex.build(self.df[text], processes=processes)
+        self._token_index_versions[text] = self.__frame_state()
+        return self.token_indexes[text]
 
+    def save_token_index(self, text, path):
         """
+            Write the token index of a text column to an .npz file.
 
-        comment_words = ""
-        stopwords = set(STOPWORDS)
+        Parameters:
+            text (str): The name of the text column the index was built from.
+            path (str): The file to write.
+        """
+        if text not in self.token_indexes:
+            raise KeyError(f"No token index for '{text}', call build_token_index first")
+        self.token_indexes[text].save(path)
 
-        # iterate through the dataframe
-        for val in self.df[text]:
-            # typecaste each val to string
-            val = str(val)
-            # split the value
-            tokens = val.split()
+    def load_token_index(self, text, path):
+        """
+            Read a token index written by save_token_index for a text column. The index must have
+            been built from the same texts as the column has now.
 
-            # Converts each token into lowercase
-            for i in range(len(tokens)):
-                tokens[i] = tokens[i].lower()
-                comment_words += " ".join(tokens) + " "
+        Parameters:
+            text (str): The name of the text column the index was built from.
+            path (str): The .npz file to read.
 
-        for j in remove_words:
-            comment_words = comment_words.replace(j, "")
+        Returns:
+            TokenIndex: The index, also kept in self.token_indexes[text].
+        """
+        index = TokenIndex.load(path)
+        if len(index) != len(self.df):
+            raise ValueError(
+                f"The index in {path} has {len(index)} documents but the DataFrame has {len(self.df)} rows"
+            )
+        if index.fingerprint is not None and index.fingerprint != column_fingerprint(self.df[text]):
+            raise ValueError(f"The index in {path} was built from different texts than '{text}'")
+        self.token_indexes[text] = index
+        self._token_index_versions[text] = self.__frame_state()
+        return index
+
+    def __current_token_index(self, text):
+        index = self.token_indexes.get(text)
+        if index is not None and self._token_index_versions.get(text) != self.__frame_state():
+            # self.df has changed since, e.g. by lowercase_strip_rows or bump_version after an edit
+            print(f"The token index of '{text}' no longer matches the DataFrame, rebuilding it")
+            index = self.build_token_index(text)
+        return index
+
+    @instrumented
+    def token_frequencies_by(self, text, by, remove_words=()):
+        """
+            Count the words of a text column for each group of rows, e.g. each rating or app version.
+
+        Parameters:
+            text (str): The name of the text column in the DataFrame.
+            by (str): The column to group rows by.
+            remove_words (list, optional): Words to leave out, in addition to the stopwords.
+
+        Returns:
+            dict: group -> Counter of word counts, which can be passed to WordCloud.generate_from_frequencies.
+        """
+        index = self.__current_token_index(text)
+        if index is None:
+            index = self.build_token_index(text)
+        return index.frequencies_by(
+            self.df[by], excluded_words=set(STOPWORDS) | set(remove_words)
+        )
+
+    @instrumented
+    def create_wordcloud(self, text, remove_words, processes="auto", mask=None):
+        """
+            Generate and display a word cloud from a text column in a DataFrame.
+
+        Parameters:
+            text (str): The name of the text column in the DataFrame.
+            remove_words (list): A list of words to remove from the word cloud.
+            processes (int, optional): Number of processes used to tokenize the column. Default 'auto' uses
+                one per core for columns of 200,000 rows or more and a single process otherwise.
+            mask (array-like of bool, optional): Only use the rows where mask is True,
+                e.g. df['rating'] <= 2. Default is None, i.e. every row.
+
+        Returns:
+            WordCloud: A WordCloud object representing the generated word cloud. If the Visualisation
+                is headless, the matplotlib Figure showing it is returned instead and the WordCloud is
+                kept in self.wordcloud.
+
+        The word counts are kept in self.token_frequencies. If build_token_index has been called
+        for the column they come from the index, otherwise the column is tokenized review by review.
+        The index is rebuilt when the DataFrame has changed since (see describe_columns).
+        Stopwords and remove_words are dropped as whole words, so removing "app" no longer
+        removes it from inside "happy". Missing reviews are skipped rather than counted as "nan".
+        """
+        excluded_words = set(STOPWORDS) | set(remove_words)
+        index = self.__current_token_index(text)
+        if index is not None:
+            self.token_frequencies = index.frequencies(mask, excluded_words=excluded_words)
+        else:
+            texts = self.df[text] if mask is None else self.df[text][np.asarray(mask, dtype=bool)]
+            if processes == "auto":
+                processes = default_processes(texts)
+            self.token_frequencies = count_tokens(
+                texts, excluded_words=excluded_words, processes=processes
+            )
 
         wordcloud = WordCloud(
             width=600,
             height=600,
             background_color="white",
-            stopwords=stopwords,
             min_font_size=10,
-        ).generate(comment_words)
+        ).generate_from_frequencies(self.token_frequencies)
+        self.wordcloud = wordcloud
+
+        if self.headless:
+            # a Figure outside pyplot, so batch jobs do not accumulate open figures
+            fig = Figure(figsize=(8, 8))
+            ax = fig.add_subplot()
+            ax.imshow(wordcloud)
+            ax.axis("off")
+            fig.tight_layout(pad=0)
+            return fig
 
         # plot the WordCloud image
         plt.figure(figsize=(8, 8), facecolor=None)
@@ -0,0 +1,106 @@
+"""Compares the pandas and polars Visualisation backends on the same data.
+
+Times describe_columns, plot_count_and_proportion and custom_graph split by a z_column, both on
+an in-memory pandas frame and on a lazy scan of the same data written to Parquet, and checks the
+polars results match pandas. Run from the top of the repository:
+
+    python benchmarks/backend_benchmark.py --rows 1000000 --columns 30
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from analysis.visualisation_class import Visualisation  # noqa: E402
+from benchmarks.describe_columns_benchmark import frames_match, make_survey_frame  # noqa: E402
+
+
+def traces_match(left, right):
+    return len(left.data) == len(right.data) and all(
+        a.name == b.name
+        and list(a.x) == list(b.x)
+        and np.allclose(np.asarray(a.y, float), np.asarray(b.y, float), equal_nan=True)
+        for a, b in zip(left.data, right.data)
+    )
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=30)
+    args = parser.parse_args()
+
+    df = make_survey_frame(args.rows, args.columns)
+    print(f"Frame: {args.rows:,} rows x {args.columns} columns")
+    count_columns = [column for column in df.columns if column.startswith(("rating", "version"))]
+    x_column = next(column for column in df.columns if column.startswith("date"))
+    y_column = next(column for column in df.columns if column.startswith("score"))
+    z_column = next(column for column in df.columns if column.startswith("version"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        parquet_path = Path(folder) / "reviews.parquet"
+        df.to_parquet(parquet_path)
+
+        for label, data in [("pandas frame", df), ("parquet scan", str(parquet_path))]:
+            print(f"\nInput: {label}")
+            results = {}
+            for backend in ("pandas", "polars"):
+                if backend == "pandas" and label == "parquet scan":
+                    # the pandas path has to read the whole file first
+                    frame, read_seconds = timed(lambda: pd.read_parquet(parquet_path))
+                    print(f"  pandas read_parquet: {read_seconds:.2f}s")
+                    visualizer = Visualisation(frame, headless=True)
+                else:
+                    visualizer = Visualisation(data, headless=True, backend=backend)
+                results[backend] = {}
+                for step, call in [
+                    ("describe_columns", lambda: visualizer.describe_columns()),
+                    (
+                        "plot_count_and_proportion",
+                        lambda: visualizer.plot_count_and_proportion(count_columns),
+                    ),
+                    (
+                        "custom_graph by z_column",
+                        lambda: visualizer.custom_graph(
+                            None, x_column, {y_column: "line"}, z_column=z_column
+                        ),
+                    ),
+                ]:
+                    result, seconds = timed(call)
+                    results[backend][step] = result
+                    print(f"  {backend:>6} {step}: {seconds:.2f}s")
+
+            pandas_results, polars_results = results["pandas"], results["polars"]
+            matches = {
+                "describe_columns": frames_match(
+                    polars_results["describe_columns"], pandas_results["describe_columns"]
+                ),
+                "plot_count_and_proportion": all(
+                    traces_match(left, right)
+                    for left, right in zip(
+                        polars_results["plot_count_and_proportion"],
+                        pandas_results["plot_count_and_proportion"],
+                    )
+                ),
+                "custom_graph by z_column": traces_match(
+                    polars_results["custom_graph by z_column"],
+                    pandas_results["custom_graph by z_column"],
+                ),
+            }
+            print(f"  polars output matches pandas: {matches}")
+            del results, pandas_results, polars_results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Compares Visualisation.describe_columns with the previous multi-pass implementation.
+
+Run from the top of the repository:
+
+    python benchmarks/describe_columns_benchmark.py --rows 1000000 --columns 30
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from analysis.visualisation_class import Visualisation  # noqa: E402
+
+
+def describe_columns_reference(df):
+    """The describe_columns implementation before the single-pass rewrite."""
+    column_info_dict = {
+        "data_type": df.dtypes,
+        "count_of_entries_with_na": df.shape[0],
+        "count_of_entries_wo_na": df.count(),
+        "nan_count": df.isnull().sum(),
+        "count_of_uniques_with_na": df.nunique(dropna=False),
+        "count_of_uniques_wo_na": df.nunique(dropna=True),
+        "proportion_count_with_na": df.apply(
+            lambda col: col.value_counts(normalize=True, dropna=False).to_dict()
+        ),
+        "proportion_count_wo_na": df.apply(
+            lambda col: col.value_counts(normalize=True, dropna=True).to_dict()
+        ),
+        "mean": df.mean(numeric_only=True),
+        "std": df.std(numeric_only=True),
+        "min": df.apply(
+            lambda col: col.min()
+            if pd.api.types.is_numeric_dtype(col)
+            or pd.api.types.is_datetime64_any_dtype(col)
+            else pd.NA
+        ),
+        "25%": df.quantile(0.25, numeric_only=True),
+        "50%": df.quantile(0.50, numeric_only=True),
+        "75%": df.quantile(0.75, numeric_only=True),
+        "max": df.apply(
+            lambda col: col.max()
+            if pd.api.types.is_numeric_dtype(col)
+            or pd.api.types.is_datetime64_any_dtype(col)
+            else pd.NA
+        ),
+    }
+    return (
+        pd.DataFrame(column_info_dict).reset_index().rename(columns={"index": "column_name"})
+    )
+
+
+def make_survey_frame(rows, columns, seed=0):
+    """A review-like frame mixing ratings, versions, floats with NaN, dates and free text."""
+    rng = np.random.default_rng(seed)
+    versions = np.array([f"4.{i} ({i + 10})" for i in range(40)] + [None], dtype=object)
+    words = np.array(["app", "check", "in", "crash", "venue", "test", "isolate", "good"])
+    data = {}
+    for i in range(columns):
+        kind = i % 5
+        if kind == 0:
+            data[f"rating_{i}"] = rng.integers(1, 6, rows)
+        elif kind == 1:
+            data[f"version_{i}"] = versions[rng.integers(0, len(versions), rows)]
+        elif kind == 2:
+            values = rng.normal(size=rows)
+            values[rng.random(rows) < 0.1] = np.nan
+            data[f"score_{i}"] = values
+        elif kind == 3:
+            data[f"date_{i}"] = pd.Timestamp("2021-11-01") + pd.to_timedelta(
+                rng.integers(0, 330 * 24, rows), unit="h"
+            )
+        else:
+            data[f"text_{i}"] = pd.Series(words[rng.integers(0, len(words), rows)]) + (
+                " " + pd.Series(rng.integers(0, rows // 2, rows).astype(str))
+            )
+    return pd.DataFrame(data)
+
+
+def frames_match(result, expected):
+    for column in expected.columns:
+        for left, right in zip(result[column], expected[column]):
+            if isinstance(left, dict):
+                # NaN keys are different objects in each dict, so compare as sorted Series
+                left, right = pd.Series(left).sort_index(), pd.Series(right).sort_index()
+                same = left.index.equals(right.index) and np.allclose(left, right)
+            elif pd.api.types.is_scalar(left) and pd.isna(left):
+                same = pd.isna(right)
+            else:
+                same = left == right or np.isclose(left, right)
+            if not same:
+                print(f"Mismatch in {column}")
+                return False
+    return list(result.columns) == list(expected.columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=30)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    df = make_survey_frame(args.rows, args.columns)
+    print(f"Frame: {args.rows:,} rows x {args.columns} columns")
+
+    start = time.perf_counter()
+    expected = describe_columns_reference(df)
+    reference_seconds = time.perf_counter() - start
+    print(f"previous implementation: {reference_seconds:.2f}s")
+
+    timings = {}
+    for label, kwargs in [
+        ("single pass, 1 worker", {"max_workers": 1}),
+        ("single pass, thread pool", {"max_workers": args.max_workers}),
+        (
+            "single pass, process pool",
+            {"max_workers": args.max_workers, "use_processes": True},
+        ),
+    ]:
+        start = time.perf_counter()
+        result = Visualisation(df).describe_columns(**kwargs)
+        timings[label] = time.perf_counter() - start
+        print(
+            f"{label}: {timings[label]:.2f}s "
+            f"({reference_seconds / timings[label]:.1f}x faster, "
+            f"output matches: {frames_match(result, expected)})"
+        )
+        # the proportion dicts of a 1M row frame take several GB, so free them between runs
+        del result
+
+
+if __name__ == "__main__":
+    main()
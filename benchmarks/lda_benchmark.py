@@ -0,0 +1,132 @@
+"""Compares the in-memory LDA of perform_topic_modeling with streaming_topic_modeling.
+
+Writes a synthetic file of reviews (one per line) and trains on it three ways, each in a fresh
+process so the peak memory of one does not hide another's:
+
+- current: perform_topic_modeling as in notebooks/main.py, with all reviews as one document
+- in-memory: the same code with one document per review (tokens and corpus held in lists)
+- streaming: streaming_topic_modeling, with the MmCorpus on disk and LdaMulticore workers
+
+Reports docs/sec and the peak resident memory of the training process (LdaMulticore's workers are
+forked from it). The streaming path only pulls ahead on speed with several cores to use. Run from
+the top of the repository:
+
+    python benchmarks/lda_benchmark.py --documents 200000 --workers 3
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.instrumentation import _peak_rss_bytes  # noqa: E402
+
+
+def word(number):
+    # simple_preprocess drops digits, so words are spelt with letters only
+    letters = ""
+    while True:
+        number, remainder = divmod(number, 26)
+        letters += chr(ord("a") + remainder)
+        if not number:
+            return "w" + letters
+
+
+def write_reviews(path, documents, seed=0):
+    rng = np.random.default_rng(seed)
+    # a few themes with overlapping words, plus a long tail of rare words
+    themes = [
+        [word(t * 40 + w) for w in range(40)] + [word(1000 + w) for w in range(10)]
+        for t in range(8)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(documents):
+            theme = themes[rng.integers(len(themes))]
+            words = list(rng.choice(theme, size=rng.integers(8, 40)))
+            words.append(word(10_000 + rng.integers(documents)))
+            f.write(" ".join(words) + "\n")
+
+
+def current_topic_modeling(path, num_topics, num_words):
+    # the body of perform_topic_modeling, which the Streamlit apps cannot be imported for
+    import gensim
+    from gensim import corpora, models
+
+    text = Path(path).read_text(encoding="utf-8")
+    tokens = gensim.utils.simple_preprocess(text)
+    stop_words = gensim.parsing.preprocessing.STOPWORDS
+    preprocessed_text = [[token for token in tokens if token not in stop_words]]
+    dictionary = corpora.Dictionary(preprocessed_text)
+    corpus = [dictionary.doc2bow(text) for text in preprocessed_text]
+    lda_model = models.LdaModel(corpus=corpus, id2word=dictionary, num_topics=num_topics)
+    return lda_model.show_topics(num_topics, num_words=num_words)
+
+
+def in_memory_topic_modeling(path, num_topics, num_words):
+    from gensim import corpora, models
+
+    from topic_modelling.incremental import tokenize_document
+
+    with open(path, encoding="utf-8") as f:
+        preprocessed_text = [tokenize_document(line) for line in f]
+    dictionary = corpora.Dictionary(preprocessed_text)
+    corpus = [dictionary.doc2bow(text) for text in preprocessed_text]
+    lda_model = models.LdaModel(corpus=corpus, id2word=dictionary, num_topics=num_topics)
+    return lda_model.show_topics(num_topics, num_words=num_words)
+
+
+def streaming(path, num_topics, num_words, workers):
+    from topic_modelling.streaming_lda import streaming_topic_modeling
+
+    return streaming_topic_modeling(
+        path, num_topics=num_topics, num_words=num_words, workers=workers
+    )
+
+
+def run(queue, name, path, num_topics, num_words, workers):
+    start = time.perf_counter()
+    if name == "current":
+        current_topic_modeling(path, num_topics, num_words)
+    elif name == "in-memory":
+        in_memory_topic_modeling(path, num_topics, num_words)
+    else:
+        streaming(path, num_topics, num_words, workers)
+    queue.put((time.perf_counter() - start, _peak_rss_bytes()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200_000)
+    parser.add_argument("--topics", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "reviews.txt"
+        write_reviews(path, args.documents)
+        print(f"Reviews: {args.documents:,} ({path.stat().st_size / 1e6:.0f} MB)")
+        for name in ("current", "in-memory", "streaming"):
+            queue = context.Queue()
+            process = context.Process(
+                target=run, args=(queue, name, str(path), args.topics, 10, args.workers)
+            )
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"  {name:>9}: failed")
+                continue
+            seconds, peak = queue.get()
+            peak_text = "n/a" if peak is None else f"{peak / 1e6:,.0f} MB"
+            print(
+                f"  {name:>9}: {seconds:.1f}s, {args.documents / seconds:,.0f} docs/sec, "
+                f"peak memory {peak_text}"
+            )
+
+
+if __name__ == "__main__":
+    main()
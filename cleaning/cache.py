@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+with open("../config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+
+class ParquetCache:
+    def __init__(self, cache_folder=None, max_bytes=5 * 1024**3):
+        """A size-bounded cache of cleaned DataFrames stored as Parquet files.
+
+        Entries are keyed by the content of the raw input files plus the cleaning steps
+        applied to them, so changing either a file or a step gives a new entry. When the
+        folder grows past max_bytes the least recently used entries are deleted.
+
+        Args:
+            cache_folder (str, optional): Where to store the Parquet files.
+                                          Default is a cache folder inside data_processed_folder from config.yaml.
+            max_bytes (int, optional): Maximum total size of the cache folder. Default is 5 GB.
+        """
+        if cache_folder is None:
+            cache_folder = Path(config["data_processed_folder"]) / "cache"
+        self.cache_folder = Path(cache_folder)
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, source_files, operations):
+        """Returns the cache key for a list of input files and the operations applied to them.
+
+        Args:
+            source_files (list): Paths of the raw input files.
+            operations (list): The cleaning steps, e.g. PreProcessing.plan.
+
+        Returns:
+            str: A sha256 hex digest.
+        """
+        digest = hashlib.sha256()
+        for path in source_files:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        digest.update(json.dumps(operations, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def __path(self, key):
+        return self.cache_folder / f"{key}.parquet"
+
+    def get(self, key):
+        """Returns the cached DataFrame for key, or None if there is no entry.
+
+        The attrs given to put are in the returned DataFrame's attrs.
+        """
+        path = self.__path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # modification time is used as the last-used time for eviction
+        os.utime(path)
+        df = pd.read_parquet(path)
+        # Parquet has one string type, which pandas reads back as string[python]
+        arrow_strings = df.attrs.pop("arrow_string_columns", [])
+        if arrow_strings:
+            df = df.astype({column: "string[pyarrow]" for column in arrow_strings})
+        return df
+
+    def put(self, key, df, attrs=None):
+        """Stores df under key and evicts old entries if the cache is over max_bytes.
+
+        Args:
+            key (str): The key returned by key().
+            df (pd.DataFrame): The DataFrame to store.
+            attrs (dict, optional): JSON-serialisable values stored with df and returned
+                                    in the attrs of the DataFrame from get().
+        """
+        path = self.__path(key)
+        temporary_path = path.with_suffix(".tmp")
+        stored = df.copy(deep=False)
+        stored.attrs = {
+            **(attrs or {}),
+            "arrow_string_columns": [
+                column
+                for column, dtype in df.dtypes.items()
+                if isinstance(dtype, pd.StringDtype) and dtype.storage == "pyarrow"
+            ],
+        }
+        try:
+            stored.to_parquet(temporary_path)
+        except Exception as e:
+            # e.g. object columns mixing strings and numbers cannot be written to Parquet
+            temporary_path.unlink(missing_ok=True)
+            print(f"Unable to cache DataFrame: {e}")
+            return
+        temporary_path.replace(path)
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(
+            self.cache_folder.glob("*.parquet"), key=lambda path: path.stat().st_mtime
+        )
+        total_bytes = sum(path.stat().st_size for path in entries)
+        for path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= path.stat().st_size
+            path.unlink()
+            self.evictions += 1
+
+    def stats(self):
+        """Returns a dict of hits, misses, hit rate, evictions, entries and total size."""
+        entries = list(self.cache_folder.glob("*.parquet"))
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(path.stat().st_size for path in entries),
+        }
@@ -0,0 +1,108 @@
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+with open("../config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+# the settings used to read the monthly app review exports
+REVIEW_CSV_KWARGS = {
+    "engine": "c",
+    "delimiter": ",",
+    "header": 0,
+    "encoding": "latin",
+    "on_bad_lines": "warn",
+    "lineterminator": "\n",
+}
+
+
+def _read_file(path, read_csv_kwargs):
+    """Reads one CSV and returns it with its row count, timing and number of skipped bad lines."""
+    start = time.perf_counter()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+        df = pd.read_csv(path, **read_csv_kwargs)
+    seconds = time.perf_counter() - start
+
+    # the c engine reports every skipped line as a "Skipping line ..." entry in a ParserWarning
+    bad_lines = sum(
+        str(warning.message).count("Skipping line")
+        for warning in caught
+        if issubclass(warning.category, pd.errors.ParserWarning)
+    )
+    stats = {
+        "file": Path(path).name,
+        "rows": len(df),
+        "bad_lines": bad_lines,
+        "seconds": seconds,
+        "rows_per_second": len(df) / seconds if seconds else float("nan"),
+    }
+    return df, stats
+
+
+def load_review_files(
+    file_glob="reviews_reviews_uk.nhs.covid19.production_*.csv",
+    data_folder=None,
+    max_workers=None,
+    **read_csv_kwargs,
+):
+    """Reads every CSV matching file_glob in parallel and concatenates them once.
+
+    Args:
+        file_glob (str, optional): Glob pattern for the files inside data_folder.
+                                   Default matches the monthly NHS Covid-19 app review exports.
+        data_folder (str, optional): Folder to search. Default is data_folder from config.yaml.
+        max_workers (int, optional): Number of worker processes. Default is one per core.
+        **read_csv_kwargs: Arguments for pd.read_csv, overriding REVIEW_CSV_KWARGS.
+
+    Returns:
+        A tuple of (DataFrame with the rows of every file in file name order,
+        DataFrame with the rows, bad lines, seconds and rows/sec of each file).
+    """
+    if data_folder is None:
+        data_folder = config["data_folder"]
+
+    paths = sorted(Path(data_folder).glob(file_glob))
+    if not paths:
+        raise FileNotFoundError(f"No files matching {file_glob} found in {data_folder}")
+
+    return load_files(paths, max_workers=max_workers, **read_csv_kwargs)
+
+
+def load_files(paths, max_workers=None, **read_csv_kwargs):
+    """Reads a list of CSV files in parallel and concatenates them once.
+
+    Args:
+        paths (list): The CSV files to read, in the order their rows should appear.
+        max_workers (int, optional): Number of worker processes. Default is one per core.
+        **read_csv_kwargs: Arguments for pd.read_csv, overriding REVIEW_CSV_KWARGS.
+
+    Returns:
+        A tuple of (concatenated DataFrame, DataFrame of per-file load statistics).
+    """
+    read_csv_kwargs = {**REVIEW_CSV_KWARGS, **read_csv_kwargs}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(_read_file, paths, [read_csv_kwargs] * len(paths))
+        )
+
+    frames = [df for df, _ in results]
+    load_stats = pd.DataFrame([stats for _, stats in results])
+    for stats in load_stats.itertuples():
+        print(
+            f"Read {stats.file}: {stats.rows} rows, {stats.bad_lines} bad lines, "
+            f"{stats.rows_per_second:,.0f} rows/sec"
+        )
+
+    # concatenate once rather than growing the frame file by file
+    df = pd.concat(frames, ignore_index=True)
+    print(
+        f"Total number of records: {len(df)} from {len(paths)} files "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return df, load_stats
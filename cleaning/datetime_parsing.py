@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+UNITS = ["D", "s", "ms", "us", "ns"]
+
+
+class DatetimeParser:
+    def __init__(self):
+        """Parses date columns by converting each distinct value once.
+
+        Review timestamps repeat heavily, so each column is factorised, only the unique
+        values are parsed, and the results are mapped back to the rows with the codes.
+        Date components are extracted from the parsed unique values the same way.
+        The format inferred for a column is remembered and reused on later calls for the
+        same frame version; a new version (e.g. another file with a column of the same
+        name) forgets the formats. A remembered format that does not fit the values is
+        inferred again from them.
+        """
+        self.formats = {}
+        self.version = None
+
+    def __use_version(self, version):
+        if version is None or version != self.version:
+            self.formats = {}
+            self.version = version
+
+    def __infer_format(self, column, uniques):
+        if column not in self.formats:
+            first = next((value for value in uniques if isinstance(value, str)), None)
+            self.formats[column] = (
+                None if first is None else guess_datetime_format(first)
+            )
+        return self.formats[column]
+
+    def __parse_uniques(self, series, value=None, version=None):
+        """Returns (codes, parsed unique values), or None if the values cannot be parsed."""
+        codes, uniques = pd.factorize(series)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return codes, uniques
+
+        self.__use_version(version)
+        remembered = value is None and series.name in self.formats
+        try:
+            if value in UNITS:
+                parsed = pd.to_datetime(uniques, unit=value)
+            else:
+                parsed = pd.to_datetime(
+                    uniques,
+                    format=self.__infer_format(series.name, uniques) if value is None else value,
+                )
+        except (ValueError, TypeError, OverflowError):
+            if not remembered:
+                return None
+            # the remembered format came from other values, so infer it from these instead
+            del self.formats[series.name]
+            return self.__parse_uniques(series, version=version)
+        return codes, parsed
+
+    def parse(self, series, value=None, version=None):
+        """Converts a column to datetime.
+
+        Args:
+            series (pd.Series): The column to convert.
+            value (str, optional): Either the format of the strings or the unit of the integers
+                                   ('D', 's', 'ms', 'us', 'ns'). If None the format is inferred
+                                   from the first value and cached for the column.
+            version (int, optional): The frame_version of the frame the column belongs to.
+                                     Inferred formats are only reused for the same version.
+
+        Returns:
+            pd.Series: The converted column, or the column unchanged if it cannot be parsed
+            (like pd.to_datetime(errors="ignore")).
+        """
+        parsed_uniques = self.__parse_uniques(series, value, version)
+        if parsed_uniques is None:
+            return series
+        codes, parsed = parsed_uniques
+        values = pd.api.extensions.take(parsed.array, codes, allow_fill=True)
+        return pd.Series(values, index=series.index, name=series.name)
+
+    def components(self, col, series, replacement_dict, version=None):
+        """Extracts every requested date component of a column from a single parse.
+
+        Args:
+            col (str): Name used as the prefix of the new columns.
+            series (pd.Series): The date column, as datetimes or as strings to parse.
+            replacement_dict (dict): The options of PreProcessing.extract_date_info.
+            version (int, optional): The frame_version of the frame, as for parse.
+
+        Returns:
+            dict: New column name -> extracted component.
+        """
+        parsed_uniques = self.__parse_uniques(series, version=version)
+        if parsed_uniques is None:
+            raise ValueError(f"Unable to parse {col} as datetime")
+        codes, parsed = parsed_uniques
+        parsed = pd.DatetimeIndex(parsed)
+
+        components = {}
+        for component, extract in replacement_dict.items():
+            if component == "strftime":
+                values = parsed.strftime("%p")
+            elif component == "day_name":
+                values = parsed.day_name()
+            elif component == "custom":
+                values = parsed.strftime(extract)
+            else:
+                values = getattr(parsed, component)
+            components[f"{col}_{component}"] = pd.Series(
+                pd.api.extensions.take(np.asarray(values), codes, allow_fill=True),
+                index=series.index,
+            )
+        return components
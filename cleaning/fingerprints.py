@@ -0,0 +1,140 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# integers beyond this are not all exact as float64, so such columns keep their own hash
+_MAX_EXACT_FLOAT_INTEGER = 2**53
+
+
+def normalise_for_hashing(column):
+    """Converts a column to the dtype its values are hashed in, so equal values hash the same
+    whatever dtype a file or chunk happened to be read with.
+
+    Numbers become float64 (an int64 column in one chunk and a float64 column with NaN in another
+    would otherwise hash differently), booleans, categoricals and string dtypes (string[python],
+    string[pyarrow]) become object, and datetimes become datetime64[ns], in UTC if tz-aware.
+    """
+    dtype = column.dtype
+    if (
+        isinstance(dtype, pd.CategoricalDtype)
+        or pd.api.types.is_bool_dtype(dtype)
+        or pd.api.types.is_string_dtype(dtype)
+    ):
+        return column.astype(object)
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return column.dt.tz_convert("UTC").dt.tz_localize(None).astype("datetime64[ns]")
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return column.astype("datetime64[ns]")
+    if pd.api.types.is_numeric_dtype(dtype):
+        values = column.to_numpy(dtype="float64", na_value=np.nan)
+        if (
+            pd.api.types.is_integer_dtype(dtype)
+            and np.nanmax(np.abs(values), initial=0) >= _MAX_EXACT_FLOAT_INTEGER
+        ):
+            return column
+        return pd.Series(values, index=column.index)
+    return column
+
+
+def combine_column_hashes(columns, length):
+    """Folds the 64-bit hashes of several columns into one hash per row.
+
+    Each column is hashed after normalise_for_hashing, so fingerprints do not depend on dtypes.
+
+    Args:
+        columns (iterable): The columns (pd.Series) to hash, all of the same length.
+        length (int): Number of rows.
+
+    Returns:
+        np.ndarray: A uint64 fingerprint per row.
+    """
+    hashes = np.zeros(length, dtype=np.uint64)
+    for column in columns:
+        column_hash = pd.util.hash_pandas_object(normalise_for_hashing(column), index=False)
+        hashes = hashes * np.uint64(1000003) ^ column_hash.to_numpy()
+    return hashes
+
+
+def row_fingerprints(df, subset=None):
+    """Returns one 64-bit fingerprint per row of df, over subset if given.
+
+    Rows with equal values (NaN equal to NaN) always get equal fingerprints. Different rows
+    collide with probability of about n**2 / 2**65, i.e. practically never for survey data.
+    """
+    columns = df.columns if subset is None else subset
+    return combine_column_hashes((df[column] for column in columns), len(df))
+
+
+class FingerprintStore:
+    def __init__(self, path=None):
+        """A persistent set of the row fingerprints already kept by remove_duplicates.
+
+        Passing the same store when deduplicating each chunk or monthly file drops rows that
+        were seen in earlier ones without reloading them.
+
+        Args:
+            path (str, optional): A .npy file to load the fingerprints from and save them to.
+        """
+        self.path = None if path is None else Path(path)
+        # sorted runs, each at least as long as the next, so adding a batch only merges it with
+        # runs of a similar size and a lookup is a binary search in each of the O(log n) runs
+        self.runs = []
+        if self.path is not None and self.path.exists():
+            self.runs.append(np.sort(np.load(self.path)))
+
+    @property
+    def fingerprints(self):
+        """All fingerprints in the store, as one sorted array."""
+        if len(self.runs) > 1:
+            self.runs = [np.sort(np.concatenate(self.runs), kind="stable")]
+        return self.runs[0] if self.runs else np.array([], dtype=np.uint64)
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def __repr__(self):
+        path = None if self.path is None else str(self.path)
+        return f"FingerprintStore(path={path!r}, fingerprints={len(self)})"
+
+    def contains(self, fingerprints):
+        """Returns a boolean array flagging the fingerprints already in the store."""
+        # searching in sorted order walks each run once instead of jumping around it
+        order = np.argsort(fingerprints)
+        queries = fingerprints[order]
+        found_sorted = np.zeros(len(fingerprints), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, queries), len(run) - 1)
+            found_sorted |= run[positions] == queries
+        found = np.empty_like(found_sorted)
+        found[order] = found_sorted
+        return found
+
+    def add(self, fingerprints):
+        """Flags duplicates in a batch of fingerprints and adds the rest to the store.
+
+        A fingerprint is a duplicate if it is already in the store or appears earlier in the batch.
+
+        Returns:
+            np.ndarray: A boolean array, True for the duplicates.
+        """
+        duplicated = pd.Series(fingerprints).duplicated().to_numpy() | self.contains(
+            fingerprints
+        )
+        new = np.sort(fingerprints[~duplicated])
+        if len(new):
+            self.runs.append(new)
+        # merge like a binary counter: each fingerprint is merged O(log n) times in total
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            # timsort finds the two sorted runs and merges them in linear time
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], last]), kind="stable")
+        return duplicated
+
+    def save(self):
+        """Writes the fingerprints to self.path."""
+        if self.path is None:
+            raise ValueError("FingerprintStore has no path to save to")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(self.path, self.fingerprints)
@@ -1,58 +1,706 @@
 import pandas as pd
 import numpy as np
+import time
+from concurrent.futures import ThreadPoolExecutor
 import yaml
+from pathlib import Path
 
 # from pandas_profiling import ProfileReport #there is a warning about deprecation
 from dataprep.eda import plot, plot_correlation, create_report, plot_missing
 import sweetviz as sv
 
+from cleaning.data_loader import load_files
+from cleaning.datetime_parsing import DatetimeParser
+from cleaning.fingerprints import (
+    FingerprintStore,
+    combine_column_hashes,
+    row_fingerprints,
+)
+from src.frame_versions import frame_version, versioned
+from src.instrumentation import instrumented
+
+try:
+    import pyarrow  # noqa: F401 -- lets convert_datatype("auto") use Arrow-backed strings
+
+    _ARROW_STRINGS = True
+except ImportError:
+    _ARROW_STRINGS = False
+
 with open("../config/config.yaml", "r") as f:
     config = yaml.safe_load(f)
 
 
-class PreProcessing:
+def _convert_series_datatype(series, datatype):
+    """Converts a single column to the requested datatype, keeping NaN for numeric targets."""
+    try:
+        return pd.to_numeric(
+            series, downcast=datatype, errors="coerce"
+        )  # if we want to keep na for integer/float columns
+    except ValueError:
+        return series.astype(datatype)  # deals with converting to string or to boolean
+
+
+def _optimise_series_dtype(series, category_ratio, max_categories):
+    """Returns series converted to the smallest dtype that holds the same values.
+
+    Integers are downcast, floats are downcast only if no precision is lost, string columns
+    with few distinct values become categoricals and other string columns Arrow-backed strings.
+    """
+    if pd.api.types.is_bool_dtype(series) or isinstance(
+        series.dtype, pd.CategoricalDtype
+    ):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series):
+        downcast = pd.to_numeric(series, downcast="float")
+        lossless = (downcast.astype(series.dtype) == series) | series.isna()
+        return downcast if lossless.all() else series
+    if not pd.api.types.is_object_dtype(series):
+        return series
+
+    # one hashing pass gives both the cardinality and the categorical codes
+    codes, uniques = pd.factorize(series)
+    if len(uniques) <= max_categories and len(uniques) <= category_ratio * len(series):
+        return pd.Series(
+            pd.Categorical.from_codes(codes, uniques),
+            index=series.index,
+            name=series.name,
+        )
+    if _ARROW_STRINGS and pd.api.types.infer_dtype(uniques, skipna=True) == "string":
+        return series.astype("string[pyarrow]")
+    return series
+
+
+def _clean_column_names(columns):
+    return columns.str.lower().str.strip().str.replace(" ", "_")
+
+
+def _lowercase_strip(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # .str methods would return object; cleaning the categories keeps the column categorical
+        return _lowercase_strip_unique(series)
+    return series.str.lower().str.strip()
+
+
+def _lowercase_strip_unique(series):
+    """Lowercases and strips the distinct values of a column and maps them back through the codes."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    cleaned = pd.Series(uniques, dtype=object).str.lower().str.strip()
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # distinct categories can become equal after cleaning, so factorise them again
+        category_codes, categories = pd.factorize(cleaned)
+        new_codes = np.where(codes >= 0, category_codes[codes], -1)
+        return pd.Series(
+            pd.Categorical.from_codes(new_codes, categories),
+            index=series.index,
+            name=series.name,
+        )
+    values = pd.api.extensions.take(cleaned.to_numpy(), codes, allow_fill=True)
+    result = pd.Series(values, index=series.index, name=series.name)
+    # keep e.g. the string[pyarrow] dtype from convert_datatype('auto'), as .str methods do
+    return result if series.dtype == object else result.astype(series.dtype)
+
+
+def _memory_report(before, after):
+    """Returns a DataFrame comparing the dtype and memory of each column before and after."""
+    report = pd.DataFrame(
+        {
+            "before_dtype": before.dtypes.astype(str),
+            "after_dtype": after.dtypes.astype(str),
+            "before_bytes": before.memory_usage(index=False, deep=True),
+            "after_bytes": after.memory_usage(index=False, deep=True),
+        }
+    )
+    report["reduction"] = report["before_bytes"] / report["after_bytes"]
+    return report.rename_axis("column_name").reset_index()
+
+
+def _frame_fingerprint(df):
+    """Returns a hash of the values, index, column names and dtypes of a DataFrame."""
+    values = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    # the weighted sum makes the fingerprint depend on row order as well as content
+    weights = np.arange(1, len(values) + 1, dtype=np.uint64)
+    content = int((values * weights).sum())
+    return hash((content, tuple(df.columns), tuple(map(str, df.dtypes))))
+
+
+def _basic_profile(df):
+    """A minimal profile with one row of summary statistics per column, computed in one pass per column."""
+    rows = []
+    for column in df.columns:
+        series = df[column]
+        counts = series.value_counts(dropna=True)
+        non_null = int(counts.sum())
+        row = {
+            "column_name": column,
+            "data_type": series.dtype,
+            "count": non_null,
+            "missing": len(series) - non_null,
+            "missing_%": 100 * (len(series) - non_null) / len(series) if len(series) else 0.0,
+            "unique": len(counts),
+            "top": counts.index[0] if len(counts) else pd.NA,
+            "top_freq": int(counts.iloc[0]) if len(counts) else 0,
+        }
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            row.update(mean=series.mean(), std=series.std(), min=series.min(), max=series.max())
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            row.update(min=series.min(), max=series.max())
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+class _FusedFrame:
+    """A virtual view of a DataFrame used to execute a PreProcessing plan.
+
+    Row filters only shrink an array of surviving row positions, column drops and
+    renames only edit the list of output columns and column transforms are computed
+    for the surviving rows of the touched columns. Nothing is copied until materialise().
+    """
+
     def __init__(self, df):
+        self.base = df
+        self.positions = np.arange(len(df))
+        self.columns = list(df.columns)
+        self.derived = {}
+        # current name -> name in base, for renamed columns
+        self.base_names = {}
+
+    def __base_column(self, col):
+        return self.base[self.base_names.get(col, col)]
+
+    def column(self, col):
+        """Returns the current values of a column for the surviving rows."""
+        if col in self.derived:
+            series = self.derived[col]
+            if len(series) != len(self.positions):
+                series = series.loc[self.positions]
+                self.derived[col] = series
+            return series
+        series = self.__base_column(col).iloc[self.positions]
+        return series.set_axis(self.positions)
+
+    def set_column(self, col, series):
+        if col not in self.columns:
+            self.columns.append(col)
+        self.derived[col] = series
+
+    def drop_column(self, col):
+        self.columns.remove(col)
+        self.derived.pop(col, None)
+
+    def rename_columns(self, names):
+        """Renames the current columns to names (a list of the same length)."""
+        base_names, derived = {}, {}
+        for old, new in zip(self.columns, names):
+            if old in self.derived:
+                derived[new] = self.derived[old]
+            else:
+                base_names[new] = self.base_names.get(old, old)
+        self.columns = list(names)
+        self.base_names = base_names
+        self.derived = derived
+
+    def keep_rows(self, mask):
+        """Restricts the surviving rows to those where mask (aligned to positions) is True."""
+        self.positions = self.positions[mask]
+
+    @property
+    def index(self):
+        """The index labels of the surviving rows."""
+        return self.base.index[self.positions]
+
+    def duplicated(self, subset=None):
+        """Returns a boolean array flagging repeated rows across subset or all current columns.
+
+        Each column is factorised once and the codes are folded into a single group id,
+        so the frame is never materialised to find duplicates. NaN codes (-1) compare
+        equal to each other, matching DataFrame.duplicated().
+        """
+        group = np.zeros(len(self.positions), dtype=np.int64)
+        for col in self.columns if subset is None else subset:
+            if col in self.derived:
+                codes, uniques = pd.factorize(self.column(col))
+            else:
+                codes, uniques = pd.factorize(self.__base_column(col))
+                codes = codes[self.positions]
+            group = group * (len(uniques) + 1) + (codes + 1)
+            group, _ = pd.factorize(group)
+        return pd.Series(group).duplicated().to_numpy()
+
+    def fingerprints(self, subset=None):
+        """Returns a 64-bit hash of each surviving row over subset or all current columns.
+
+        Unlike duplicated() the hashes do not depend on the other rows in the frame,
+        so they can be compared across chunks.
+        """
+        columns = self.columns if subset is None else subset
+        return combine_column_hashes(
+            (self.column(col) for col in columns), len(self.positions)
+        )
+
+    def materialise(self):
+        index = self.index
+        data = {}
+        for col in self.columns:
+            if col in self.derived:
+                data[col] = self.column(col).set_axis(index)
+            else:
+                data[col] = self.__base_column(col).iloc[self.positions]
+        return pd.DataFrame(data, index=index, columns=self.columns, copy=False)
+
+
+class PreProcessing:
+    def __init__(
+        self, df, lazy=False, source_files=None, cache=None, instrumentation=None
+    ):
+        """
+        Args:
+            df (pd.DataFrame): The DataFrame to clean. Can be None if source_files is given,
+                               in which case lazy is always True and the files are only read
+                               by execute() when the cache misses.
+            lazy (bool, optional): If True, clean_column_names, remove_duplicates, lowercase_strip_rows,
+                                   fill_or_remove_missing_values, convert_datatype, convert_to_datetime
+                                   and extract_date_info add a step to self.plan instead of changing self.df.
+                                   Call execute() to run the plan in one fused pass and
+                                   explain() to print it. Default is False.
+            source_files (list, optional): The raw CSV files df was (or should be) read from.
+            cache (ParquetCache, optional): If given with source_files, execute() returns the
+                                            cached result for the same files and plan instead
+                                            of reading and cleaning them again.
+            instrumentation (Instrumentation, optional): Records the time, rows and memory of
+                                                         each method call (see src.instrumentation).
+        """
         self.df = df
+        # without a DataFrame the steps can only be planned until execute() reads the files
+        self.lazy = lazy or df is None
+        self.plan = []
+        self.source_files = source_files
+        self.cache = cache
+        self.instrumentation = instrumentation
+        # parses each distinct date string once and remembers the format of each column
+        self.datetime_parser = DatetimeParser()
+
+    def __add_step(self, step, **kwargs):
+        self.plan.append((step, kwargs))
+        return self
+
+    def __execute_pending(self):
+        # methods that are not part of the plan need the planned steps applied first
+        if self.lazy and (self.plan or self.df is None):
+            self.execute()
+
+    def explain(self):
+        """Prints and returns a description of the steps waiting in the plan.
+
+        Returns:
+            str: The plan, one step per line, followed by how the steps will be fused.
+        """
+        lines = ["PreProcessing plan:"]
+        if not self.plan:
+            lines.append("  (empty)")
+        for number, (step, kwargs) in enumerate(self.plan, start=1):
+            arguments = ", ".join(f"{key}={value!r}" for key, value in kwargs.items())
+            lines.append(f"  {number}. {step}({arguments})")
+
+        row_filters = 0
+        dropped_columns = []
+        transformed_columns = set()
+        for step, kwargs in self.plan:
+            if step == "remove_duplicates":
+                row_filters += 1
+            elif step == "fill_or_remove_missing_values":
+                for column, solution in kwargs["replacement_dict"].items():
+                    if solution == "remove_row":
+                        row_filters += 1
+                    elif solution == "remove_col":
+                        dropped_columns.append(column)
+                    else:
+                        transformed_columns.add(column)
+            elif step == "convert_datatype" and kwargs["column_types"] == "auto":
+                transformed_columns.update(["all columns"])
+            elif step == "convert_datatype":
+                transformed_columns.update(kwargs["column_types"])
+            elif step == "convert_to_datetime":
+                transformed_columns.update(kwargs["replacement_dict"])
+            elif step == "extract_date_info":
+                transformed_columns.update(kwargs["date_column"])
+            elif step == "lowercase_strip_rows":
+                transformed_columns.update(kwargs["columns_to_clean"])
+
+        lines.append(
+            f"Fused into: 1 row mask from {row_filters} row filter(s), "
+            f"1 column projection dropping {dropped_columns}, "
+            f"transforms on {len(transformed_columns)} column(s), 1 materialisation"
+        )
+        plan = "\n".join(lines)
+        print(plan)
+        return plan
+
+    @instrumented
+    @versioned
+    def execute(self):
+        """Runs every step in the plan in a single fused pass over self.df.
+
+        Row filters (remove_row and duplicate removal) are combined into one set of
+        surviving rows, remove_col steps into one column projection, and column
+        transforms are only computed for the surviving rows of the columns they touch.
+        The cleaned DataFrame is built once at the end and the plan is cleared.
+
+        If a cache and source_files were given, the result is looked up in the cache
+        first and stored in it after a miss, along with self.memory_report if the plan
+        has a convert_datatype('auto') step. The cache is not used when the plan has a
+        remove_duplicates(store=...) step, which has to add the rows' fingerprints to the store.
+
+        Returns:
+            A transformed dataframe.
+        """
+        use_cache = self.cache is not None and self.source_files
+        if use_cache and any(
+            step == "remove_duplicates" and kwargs["store"] is not None
+            for step, kwargs in self.plan
+        ):
+            print("Not using the cache: remove_duplicates(store=...) must see every row")
+            use_cache = False
+        if use_cache:
+            key = self.cache.key(self.source_files, self.plan)
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"Loaded cleaned data from cache ({self.cache.stats()})")
+                if "memory_report" in cached.attrs:
+                    self.memory_report = pd.DataFrame(cached.attrs.pop("memory_report"))
+                self.df = cached
+                self.plan = []
+                return self.df
+
+        if self.df is None:
+            self.df, _ = load_files(self.source_files)
+
+        frame = _FusedFrame(self.df)
+        self.skipped_columns = {}
+        self.duplicates_dropped = 0
+        self._run_plan(frame)
+
+        self.df = frame.materialise()
+        if use_cache:
+            attrs = {}
+            if any(
+                step == "convert_datatype" and kwargs["column_types"] == "auto"
+                for step, kwargs in self.plan
+            ):
+                attrs["memory_report"] = self.memory_report.to_dict("list")
+            self.cache.put(key, self.df, attrs)
+        self.plan = []
+        return self.df
+
+    def _run_plan(self, frame):
+        fused_steps = {
+            "clean_column_names": self._fused_clean_column_names,
+            "remove_duplicates": self._fused_remove_duplicates,
+            "lowercase_strip_rows": self._fused_lowercase_strip_rows,
+            "fill_or_remove_missing_values": self._fused_fill_or_remove_missing_values,
+            "convert_datatype": self._fused_convert_datatype,
+            "convert_to_datetime": self._fused_convert_to_datetime,
+            "extract_date_info": self._fused_extract_date_info,
+        }
+        for step_number, (step, kwargs) in enumerate(self.plan):
+            self._step_number = step_number
+            fused_steps[step](frame, **kwargs)
+
+    def _report_duplicates(self, number_of_duplicates):
+        print(f"Number of duplicates dropped: {number_of_duplicates}\n")
+
+    def _report_missing(self, column, number_missing):
+        # create a warning to let user know there is NaTs
+        if number_missing > 1:
+            print(
+                f"\033[91mWARNING\033[0m there are {number_missing} NaT in the {column} column"
+            )
+
+    def _fused_clean_column_names(self, frame):
+        frame.rename_columns(_clean_column_names(pd.Index(frame.columns)).tolist())
+
+    def _fused_remove_duplicates(self, frame, subset=None, method="exact", store=None):
+        if store is not None:
+            duplicated = store.add(frame.fingerprints(subset))
+        elif method == "hash":
+            duplicated = pd.Series(frame.fingerprints(subset)).duplicated().to_numpy()
+        else:
+            duplicated = frame.duplicated(subset)
+        frame.keep_rows(~duplicated)
+        self.duplicates_dropped += int(duplicated.sum())
+        self.kept_index = frame.index
+        self._report_duplicates(duplicated.sum())
+
+    def _fused_lowercase_strip_rows(self, frame, columns_to_clean, unique_values=False):
+        transform = _lowercase_strip_unique if unique_values else _lowercase_strip
+        for column in columns_to_clean:
+            if column not in frame.columns:
+                reason = "not found in dataframe"
+            else:
+                try:
+                    frame.set_column(column, transform(frame.column(column)))
+                    continue
+                except (AttributeError, TypeError, ValueError) as e:
+                    reason = f"{type(e).__name__}: {e}"
+            self._report_skipped(column, reason)
+
+    def _report_skipped(self, column, reason):
+        self.skipped_columns[column] = reason
+        print(f"Unable to convert {column} to str.lower ({reason})")
+
+    def _fused_fill_or_remove_missing_values(self, frame, replacement_dict):
+        for column, solution in replacement_dict.items():
+            if column not in frame.columns:
+                print(f"{column} not found in dataframe")
+            elif solution == "remove_row":
+                frame.keep_rows(frame.column(column).notna().to_numpy())
+            elif solution == "remove_col":
+                frame.drop_column(column)
+            else:
+                frame.set_column(column, frame.column(column).fillna(solution))
+
+    def _fused_convert_datatype(self, frame, column_types, **auto_options):
+        if column_types == "auto":
+            before = {column: frame.column(column) for column in frame.columns}
+            after = {
+                column: _optimise_series_dtype(series, **auto_options)
+                for column, series in before.items()
+            }
+            for column, series in after.items():
+                frame.set_column(column, series)
+            self.memory_report = _memory_report(
+                pd.DataFrame(before, copy=False), pd.DataFrame(after, copy=False)
+            )
+            return
+
+        for column, datatype in column_types.items():
+            if column not in frame.columns:
+                print(f"{column} not found in dataframe")
+                continue
+            converted = _convert_series_datatype(frame.column(column), datatype)
+            frame.set_column(column, converted)
+            self._report_missing(column, converted.isnull().sum())
+
+    def _fused_convert_to_datetime(self, frame, replacement_dict):
+        for key, value in replacement_dict.items():
+            converted = self.datetime_parser.parse(
+                frame.column(key), value, frame_version(frame.base)
+            )
+            frame.set_column(key, converted)
+
+            if not pd.api.types.is_datetime64_any_dtype(converted):
+                print(f"Conversion to datetime format failed for the column '{key}'.")
+            self._report_missing(key, converted.isnull().sum())
+
+    def _fused_extract_date_info(self, frame, date_column, replacement_dict):
+        for col in date_column:
+            for name, values in self.datetime_parser.components(
+                col, frame.column(col), replacement_dict, frame_version(frame.base)
+            ).items():
+                frame.set_column(name, values)
+
+    # reports already produced in this session, keyed by frame fingerprint and settings
+    _report_cache = {}
+    _report_cache_size = 16
+
+    @instrumented
+    def get_dataframe_report(
+        self, time_budget=None, stratify_by=None, engine="auto", pilot_rows=1000
+    ):
+        """Profiles the DataFrame with dataprep, falling back to sweetviz and then a built-in profile.
 
-    def get_dataframe_report(self):
+        Args:
+            time_budget (float, optional): Seconds the report may take. If given, each engine is first
+                                           run on a pilot sample to measure its speed, and then on the
+                                           largest sample that fits in the remaining budget. An engine
+                                           whose pilot alone takes longer than the budget is skipped.
+                                           Default is None, which profiles the whole DataFrame.
+            stratify_by (str, optional): Column to stratify the sample by, so every value of the
+                                         column keeps its share of rows (and at least one row).
+            engine (str, optional): 'dataprep', 'sweetviz', 'basic' or 'auto' to try them in that order.
+            pilot_rows (int, optional): Size of the pilot sample used to time each engine. Default is 1000.
+
+        Returns:
+            The report object of the engine used; a DataFrame with one row per column for 'basic'.
+            Reports are cached by a fingerprint of the DataFrame, so asking again for an unchanged
+            frame with the same settings returns immediately. A sweetviz report is shown in the
+            notebook once it is finished, not for the pilot sample.
+        """
         # pandas profiling
         # self.profile = ProfileReport(self.df, title="Pandas Profiling Report")
         # self.profile.to_file('../outputs/output.html')
+        self.__execute_pending()
 
-        try:
-            # dataprep
-            self.profile = create_report(self.df)
-            # stem_path = config["output_folder"] + 'dataprep-EDA-Report'
-            # report.save(filename= stem_path)
-        except Exception as e:
-            # sweetviz
-            self.profile = sv.analyze(self.df)
-            self.profile.show_notebook()
-            # self.report.show_html()
+        key = (_frame_fingerprint(self.df), time_budget, stratify_by, engine, pilot_rows)
+        if key in self._report_cache:
+            name, self.profile = self._report_cache[key]
+            self.__show(name)
+            return self.profile
+
+        engines = {
+            "dataprep": self.__dataprep_report,
+            "sweetviz": self.__sweetviz_report,
+            "basic": _basic_profile,
+        }
+        order = list(engines) if engine == "auto" else [engine]
 
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        for number, name in enumerate(order):
+            is_last = number == len(order) - 1
+            try:
+                if deadline is None:
+                    self.profile = engines[name](self.df)
+                else:
+                    self.profile = self.__budgeted_report(
+                        engines[name],
+                        deadline - time.perf_counter(),
+                        stratify_by,
+                        pilot_rows,
+                        must_finish=is_last,
+                    )
+            except Exception as e:
+                if is_last:
+                    raise
+                print(f"{name} report failed ({e}), trying the next engine")
+                continue
+            if self.profile is not None:
+                break
+            print(f"{name} is too slow for the time budget, trying the next engine")
+
+        if len(self._report_cache) >= self._report_cache_size:
+            self._report_cache.pop(next(iter(self._report_cache)))
+        self._report_cache[key] = (name, self.profile)
+        self.__show(name)
         return self.profile
 
+    def __show(self, engine):
+        if engine == "sweetviz":
+            self.profile.show_notebook()
+
+    def __dataprep_report(self, df):
+        report = create_report(df)
+        # stem_path = config["output_folder"] + 'dataprep-EDA-Report'
+        # report.save(filename= stem_path)
+        return report
+
+    def __sweetviz_report(self, df):
+        report = sv.analyze(df)
+        # self.report.show_html()
+        return report
+
+    def __budgeted_report(self, run, budget, stratify_by, pilot_rows, must_finish):
+        start = time.perf_counter()
+        pilot = self.__sample(pilot_rows, stratify_by)
+        report = run(pilot)
+        elapsed = time.perf_counter() - start
+        if elapsed > budget and not must_finish:
+            return None
+
+        # assume the engine's cost grows linearly with the number of rows
+        rows = int((budget - elapsed) * len(pilot) / max(elapsed, 1e-9))
+        if rows > len(pilot):
+            sample = self.__sample(rows, stratify_by)
+            report = run(sample)
+        else:
+            sample = pilot
+        print(
+            f"Profiled {len(sample)} of {len(self.df)} rows in {time.perf_counter() - start:.1f}s"
+        )
+        return report
+
+    def __sample(self, rows, stratify_by=None):
+        if rows >= len(self.df):
+            return self.df
+        if stratify_by is None:
+            return self.df.sample(n=rows, random_state=0)
+
+        # shuffle, then keep the first ceil(group size * fraction) rows of every group
+        shuffled = self.df.sample(frac=1, random_state=0)
+        groups = shuffled.groupby(stratify_by, dropna=False, sort=False)[stratify_by]
+        quota = np.ceil(groups.transform("size") * rows / len(self.df))
+        return shuffled[groups.cumcount() < quota]
+
+    @instrumented
+    @versioned
     def clean_column_names(self):
-        self.df.columns = self.df.columns.str.lower().str.strip().str.replace(" ", "_")
+        if self.lazy:
+            return self.__add_step("clean_column_names")
+
+        self.df.columns = _clean_column_names(self.df.columns)
         return self.df
 
-    def remove_duplicates(self):
-        number_of_duplicates = self.df.duplicated().sum()
-        self.df = self.df.drop_duplicates()
+    @instrumented
+    @versioned
+    def remove_duplicates(self, subset=None, method="exact", store=None):
+        """Removes duplicated rows, keeping the first occurrence.
+
+        Args:
+            subset (list, optional): Only consider these columns when identifying duplicates.
+                                     Default is all columns.
+            method (str, optional): 'exact' compares the values of the rows. 'hash' compares one 64-bit
+                                    fingerprint per row, computed in a single pass, which is faster and
+                                    uses less memory on long free-text columns. Default is 'exact'.
+            store (FingerprintStore, optional): Fingerprints of rows kept earlier, e.g. from previous
+                                                chunks or monthly files. Rows found in it are dropped and
+                                                the kept rows are added to it. Implies method='hash'.
+
+        Returns:
+            A tuple of (number of duplicates dropped, index of the kept rows), also stored in
+            self.duplicates_dropped and self.kept_index. In lazy mode self, and the two attributes
+            are set by execute() (with the total over every remove_duplicates step in the plan).
+        """
+        if self.lazy:
+            return self.__add_step(
+                "remove_duplicates", subset=subset, method=method, store=store
+            )
+
+        if store is not None or method == "hash":
+            fingerprints = row_fingerprints(self.df, subset)
+            if store is not None:
+                duplicated = store.add(fingerprints)
+            else:
+                duplicated = pd.Series(fingerprints).duplicated().to_numpy()
+        else:
+            # one hashing pass, rather than duplicated() followed by drop_duplicates()
+            duplicated = self.df.duplicated(subset=subset).to_numpy()
+
+        self.df = self.df[~duplicated]
+        self.duplicates_dropped = int(duplicated.sum())
+        self.kept_index = self.df.index
 
         # tell user how many duplicates were removed
-        return print(f"Number of duplicates dropped: {number_of_duplicates}\n")
+        self._report_duplicates(self.duplicates_dropped)
+        return self.duplicates_dropped, self.kept_index
 
-    def lowercase_strip_rows(self, columns_to_clean):
+    @instrumented
+    @versioned
+    def lowercase_strip_rows(
+        self, columns_to_clean, unique_values=False, max_workers=None
+    ):
         """Transforms the entire column by lowercasing and removing trailing or leading whitespace
 
         Args:
             df (pandas DataFrame): a pandas dataframe.
             columns_to_lower (list): A list of columns the user wants to lowercase.
+            unique_values (bool, optional): If True, only the distinct values of each column are
+                                            transformed and mapped back to the rows through their codes,
+                                            which is much faster for survey answers with few distinct values.
+                                            Default is False. Either way the columns keep their dtype
+                                            (e.g. string[pyarrow]), and categorical columns have their
+                                            categories cleaned.
+            max_workers (int, optional): If given, the columns are transformed on a thread pool of this size.
+                                         Not used in lazy mode, where the step is fused into the plan.
 
 
         Returns:
             A dataframe with transformed columns.
+            Columns that could not be transformed are listed with the reason in self.skipped_columns.
 
         """
         if isinstance(columns_to_clean, pd.core.indexes.base.Index):
@@ -62,14 +710,40 @@ class PreProcessing:
         else:
             print(f"{columns_to_clean} should be either a list or an Index")
 
-        for x in columns_to_clean:
+        if self.lazy:
+            return self.__add_step(
+                "lowercase_strip_rows",
+                columns_to_clean=columns_to_clean,
+                unique_values=unique_values,
+            )
+
+        transform = _lowercase_strip_unique if unique_values else _lowercase_strip
+
+        def clean(x):
+            if x not in self.df.columns:
+                return x, None, "not found in dataframe"
             try:
-                self.df[x] = self.df[x].str.lower().str.strip()
-            except:
-                print(f"Unable to convert {x} to str.lower")
+                return x, transform(self.df[x]), None
+            except (AttributeError, TypeError, ValueError) as e:
+                return x, None, f"{type(e).__name__}: {e}"
+
+        if max_workers is None:
+            results = [clean(x) for x in columns_to_clean]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(clean, columns_to_clean))
+
+        self.skipped_columns = {}
+        for x, cleaned, reason in results:
+            if reason is None:
+                self.df[x] = cleaned
+            else:
+                self._report_skipped(x, reason)
 
         return self.df
 
+    @instrumented
+    @versioned
     def fill_or_remove_missing_values(self, replacement_dict: dict):
         """
         Returns a dataframe with removed or replaced missing values.
@@ -88,6 +762,10 @@ class PreProcessing:
         Returns:
             A transformed dataframe.
         """
+        if self.lazy:
+            return self.__add_step(
+                "fill_or_remove_missing_values", replacement_dict=replacement_dict
+            )
 
         for column, solution in replacement_dict.items():
             if solution == "remove_row":
@@ -110,38 +788,65 @@ class PreProcessing:
 
         return self.df
 
-    def convert_datatype(self, column_types: dict):
+    @instrumented
+    @versioned
+    def convert_datatype(
+        self, column_types: dict, category_ratio=0.5, max_categories=1000
+    ):
         """This function transforms specific columns datatypes depending on whether the user wants to keep NaN or not.
 
         Args:
             column_types (dict): A dictionary with columns as keys and datatype as values.
             datatype needs to be in quotes if user wants to keep NaN values.
             Example: {'col_name': 'integer', 'col_name_2': 'int64', 'col_name' : str}
-
+            Or 'auto' to shrink every column: integers and floats are downcast (floats only if
+            no precision is lost), string columns with few distinct values become categoricals
+            and other string columns become Arrow-backed strings.
+            category_ratio (float, optional): With 'auto', a string column becomes categorical if its
+                                              number of distinct values is at most this fraction of its rows.
+            max_categories (int, optional): With 'auto', the most distinct values a categorical may have.
 
 
         Returns:
             A DataFrame with updated data types.
-
-
+            With 'auto', a DataFrame reporting each column's dtype and memory before and after
+            instead (also stored in self.memory_report).
 
         """
 
-        if not isinstance(column_types, dict):
+        if not isinstance(column_types, dict) and column_types != "auto":
             raise TypeError(
-                "column_types should be a dictionary. Example - {'col_name' : 'integer','col_name_2' : int64}"
+                "column_types should be a dictionary or 'auto'. Example - {'col_name' : 'integer','col_name_2' : int64}"
+            )
+        auto_options = {}
+        if column_types == "auto":
+            auto_options = dict(
+                category_ratio=category_ratio, max_categories=max_categories
+            )
+        if self.lazy:
+            return self.__add_step(
+                "convert_datatype", column_types=column_types, **auto_options
+            )
+
+        if column_types == "auto":
+            before = self.df
+            self.df = pd.DataFrame(
+                {
+                    column: _optimise_series_dtype(self.df[column], **auto_options)
+                    for column in self.df.columns
+                },
+                index=self.df.index,
             )
+            self.memory_report = _memory_report(before, self.df)
+            saved = self.memory_report["before_bytes"].sum() / self.memory_report[
+                "after_bytes"
+            ].sum()
+            print(f"Memory reduced {saved:.1f}x")
+            return self.memory_report
 
         for column, datatype in column_types.items():
             if column in self.df.columns:
-                try:
-                    self.df[column] = pd.to_numeric(
-                        self.df[column], downcast=datatype, errors="coerce"
-                    )  # if we want to keep na for integer/float columns
-                except ValueError:
-                    self.df[column] = self.df[column].astype(
-                        datatype
-                    )  # deals with converting to string or to boolean
+                self.df[column] = _convert_series_datatype(self.df[column], datatype)
 
             # create a warning to let user know there is NaTs
             Number_of_NaN = self.df[column].isnull().sum()
@@ -154,6 +859,8 @@ class PreProcessing:
 
         return self.df
 
+    @instrumented
+    @versioned
     def convert_to_datetime(self, replacement_dict: dict):
         """This returns a dataframe with the correct date format.
 
@@ -168,14 +875,15 @@ class PreProcessing:
 
 
         """
+        if self.lazy:
+            return self.__add_step(
+                "convert_to_datetime", replacement_dict=replacement_dict
+            )
 
         for key, value in replacement_dict.items():
-            if value in ["D", "s", "ms", "us", "ns"]:
-                self.df[key] = pd.to_datetime(self.df[key], unit=value, errors="ignore")
-            else:
-                self.df[key] = pd.to_datetime(
-                    self.df[key], format=value, errors="ignore"
-                )
+            self.df[key] = self.datetime_parser.parse(
+                self.df[key], value, frame_version(self.df)
+            )
 
             # Check if the column is now in datetime format
             if not pd.api.types.is_datetime64_any_dtype(self.df[key]):
@@ -192,6 +900,8 @@ class PreProcessing:
 
         return self.df
 
+    @instrumented
+    @versioned
     def extract_date_info(self, date_column: list, replacement_dict: dict):
         """Returns a dataframe with new columns representing different time stamps
 
@@ -215,20 +925,116 @@ class PreProcessing:
         """
         if not isinstance(date_column, list):
             raise TypeError("date_column should be a list.")
+        if self.lazy:
+            return self.__add_step(
+                "extract_date_info",
+                date_column=date_column,
+                replacement_dict=replacement_dict,
+            )
 
         for col in date_column:
-            date_info = pd.to_datetime(self.df[col])
-            for component, extract in replacement_dict.items():
-                if component == "strftime":
-                    self.df[f"{col}_{component}"] = date_info.dt.strftime("%p")
-                elif component == "day_name":
-                    self.df[
-                        f"{col}_{component}"
-                    ] = date_info.dt.day_name()  # does this need to be here?
-                elif component == "custom":
-                    self.df[f"{col}_{component}"] = date_info.dt.strftime(extract)
-                else:
-                    extracted_component = getattr(date_info.dt, component)
-                    self.df[f"{col}_{component}"] = extracted_component
+            for name, values in self.datetime_parser.components(
+                col, self.df[col], replacement_dict, frame_version(self.df)
+            ).items():
+                self.df[name] = values
 
         return self.df
+
+
+class StreamingPreProcessing(PreProcessing):
+    def __init__(
+        self, source, chunksize=100_000, instrumentation=None, **read_csv_kwargs
+    ):
+        """Cleans a dataset that does not fit in memory one chunk at a time.
+
+        The cleaning methods always add steps to self.plan (as with PreProcessing(lazy=True)),
+        and execute() runs the plan on each chunk and appends the result to a CSV file.
+        Duplicates are removed across the whole dataset, not just within a chunk, and the
+        NaN/NaT warnings are reported once with totals for the whole dataset.
+        get_dataframe_report is not available, as it needs the whole dataset in memory.
+
+        Args:
+            source (str or iterable): A path to a CSV file, or an iterable of DataFrame chunks
+                                      (for example the reader returned by pd.read_csv(..., chunksize=n)).
+            chunksize (int, optional): Number of rows per chunk when source is a path. Default is 100,000.
+            instrumentation (Instrumentation, optional): Records the time of each method call.
+            **read_csv_kwargs: Extra arguments passed to pd.read_csv when source is a path.
+        """
+        super().__init__(None, lazy=True, instrumentation=instrumentation)
+        self.source = source
+        self.chunksize = chunksize
+        self.read_csv_kwargs = read_csv_kwargs
+
+    def __chunks(self):
+        if isinstance(self.source, (str, Path)):
+            return pd.read_csv(
+                self.source, chunksize=self.chunksize, **self.read_csv_kwargs
+            )
+        return iter(self.source)
+
+    @instrumented
+    def execute(self, output_path):
+        """Runs the plan on every chunk and writes the cleaned rows to output_path as they are produced.
+
+        Args:
+            output_path (str): The CSV file to write. It is overwritten if it exists.
+
+        Returns:
+            str: output_path. The total number of duplicates dropped is in self.duplicates_dropped.
+        """
+        # one set of seen row hashes per remove_duplicates step in the plan
+        self._fingerprint_stores = {}
+        self.duplicates_dropped = 0
+        self.missing_counts = {}
+        self.skipped_columns = {}
+        rows_in = rows_out = 0
+
+        Path(output_path).unlink(missing_ok=True)
+        for chunk_number, chunk in enumerate(self.__chunks()):
+            frame = _FusedFrame(chunk)
+            self._run_plan(frame)
+            cleaned = frame.materialise()
+            cleaned.to_csv(
+                output_path, mode="a", header=chunk_number == 0, index=False
+            )
+            rows_in += len(chunk)
+            rows_out += len(cleaned)
+
+        if any(step == "remove_duplicates" for step, _ in self.plan):
+            super()._report_duplicates(self.duplicates_dropped)
+        for column, number_missing in self.missing_counts.items():
+            super()._report_missing(column, number_missing)
+        for column, reason in self.skipped_columns.items():
+            print(f"Unable to convert {column} to str.lower in some chunks ({reason})")
+        print(f"Rows read: {rows_in}, rows written: {rows_out} to {output_path}")
+
+        # the kept rows are in output_path rather than in one frame's index
+        self.kept_index = None
+        self.plan = []
+        return output_path
+
+    def _fused_remove_duplicates(self, frame, subset=None, method="exact", store=None):
+        # duplicates have to be found across chunks, so every step uses a fingerprint store
+        if store is None:
+            store = self._fingerprint_stores.setdefault(
+                self._step_number, FingerprintStore()
+            )
+        super()._fused_remove_duplicates(frame, subset=subset, store=store)
+
+    def _report_duplicates(self, number_of_duplicates):
+        # self.duplicates_dropped is the running total, reported once by execute()
+        pass
+
+    def _report_missing(self, column, number_missing):
+        self.missing_counts[column] = (
+            self.missing_counts.get(column, 0) + number_missing
+        )
+
+    def _report_skipped(self, column, reason):
+        self.skipped_columns.setdefault(column, reason)
+
+    def get_dataframe_report(self, *args, **kwargs):
+        raise NotImplementedError(
+            "StreamingPreProcessing never holds the whole dataset; profile a sample with "
+            "PreProcessing(chunk).get_dataframe_report() or the cleaned output file instead"
+        )
@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+from pathlib import Path
 import pandas as pd
 
 
@@ -10,8 +11,32 @@ from sklearn.feature_extraction.text import CountVectorizer #issues
 from bertopic import BERTopic 
 from bertopic.vectorizers import ClassTfidfTransformer
 
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from topic_modelling.model_registry import get_registry
+
 
 def perform_BERT_topic_modeling(text):
+    # the embedding model (and a saved topic model, if there is one) are loaded once per process
+    registry = get_registry()
+    saved_topic_model = registry.topic_model()
+
+    # Prep data for modelling
+    #docs = df_topic["Review Text"].reset_index().drop(columns="index").to_numpy().ravel()
+    
+    text_str = str(text)
+    text_list = list(text_str)
+    # cached vectors for texts embedded before, so only new texts go through the model
+    embeddings = registry.embed(text_list)
+    if saved_topic_model is not None:
+        # a model fitted ahead of time only has to assign topics
+        topics, probs = saved_topic_model.transform(text_list, embeddings=embeddings)
+        # its topic info counts the documents it was trained on, so count the topics of this text instead
+        counts = pd.Series(topics).value_counts()
+        freq = saved_topic_model.get_topic_info().set_index("Topic").loc[counts.index.to_numpy()]
+        freq["Count"] = counts.to_numpy()
+        return freq.reset_index().head(10)
+
     ctfidf_model = ClassTfidfTransformer(bm25_weighting=True, reduce_frequent_words=True)
     # Use sklearn CountVectorizer to remove stopwords after having generated embeddings, and train model
     vectorizer_model = CountVectorizer(stop_words="english")
@@ -19,6 +44,7 @@ def perform_BERT_topic_modeling(text):
     #Train BERTopic model
     topic_model = BERTopic(
         language="multilingual",
+        embedding_model=registry.embedding_model(),
         ctfidf_model=ctfidf_model,
         # umap_model=umap_model,
         # hdbscan_model=hdbscan_model,
@@ -31,12 +57,7 @@ def perform_BERT_topic_modeling(text):
         # min_topic_size = 15,
         # diversity=0.5
     )
-    # Prep data for modelling
-    #docs = df_topic["Review Text"].reset_index().drop(columns="index").to_numpy().ravel()
-    
-    text_str = str(text)
-    text_list = list(text_str)
-    topics, probs = topic_model.fit_transform(text_list)
+    topics, probs = topic_model.fit_transform(text_list, embeddings=embeddings)
     
     # Show topic distribution of largest n topics
     freq = topic_model.get_topic_info()
@@ -46,6 +67,9 @@ def perform_BERT_topic_modeling(text):
     
 st.set_page_config(layout="wide")
 
+with st.sidebar.expander("Loaded models"):
+    st.dataframe(get_registry().stats())
+
 choice = st.sidebar.selectbox("Select your choice", ["Bert", "On CSV"])
 
                     
@@ -0,0 +1,55 @@
+import functools
+import itertools
+import threading
+import weakref
+
+# id(df) -> (weak reference to df, version). Versions come from one process-wide counter, so a
+# version is never reused, even by a new frame that happens to get the id of a collected one.
+_versions = {}
+_counter = itertools.count(1)
+_lock = threading.Lock()
+
+
+def _forget(frame_id):
+    _versions.pop(frame_id, None)
+
+
+def _register(df):
+    version = next(_counter)
+    reference = weakref.ref(df, lambda _, frame_id=id(df): _forget(frame_id))
+    _versions[id(df)] = (reference, version)
+    return version
+
+
+def frame_version(df):
+    """Returns the version of df, a number that changes whenever bump_version(df) is called.
+
+    A frame seen for the first time gets a new version, so a different DataFrame object never
+    shares a version with another one.
+    """
+    with _lock:
+        entry = _versions.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        return _register(df)
+
+
+def bump_version(df):
+    """Marks df as changed in place, so results cached for its previous version are not reused."""
+    with _lock:
+        return _register(df)
+
+
+def versioned(method):
+    """Bumps the version of self.df after method, for methods that change the frame in place."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            df = getattr(self, "df", None)
+            if df is not None:
+                bump_version(df)
+
+    return wrapper
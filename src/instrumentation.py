@@ -0,0 +1,154 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _rss_bytes():
+    """The current resident memory of the process, or the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return _peak_rss_bytes()
+
+
+class Instrumentation:
+    def __init__(self, deep_memory=False):
+        """Records the cost of each PreProcessing / Visualisation method call.
+
+        Pass an instance as instrumentation= when creating PreProcessing or Visualisation and
+        every public method records its wall time, the rows and memory of self.df before and
+        after, and the peak resident memory of the process.
+
+        Args:
+            deep_memory (bool, optional): Measure the memory of object columns exactly
+                                          (memory_usage(deep=True)). Accurate for text columns
+                                          but scans every string, so it is off by default.
+        """
+        self.deep_memory = deep_memory
+        self.records = []
+        self._origin = time.perf_counter()
+
+    def __frame_stats(self, df):
+        if not isinstance(df, pd.DataFrame):
+            return None, None
+        return len(df), int(df.memory_usage(index=True, deep=self.deep_memory).sum())
+
+    @contextmanager
+    def record(self, name, owner=None):
+        """Records the wall time of the with block, and the rows and memory of owner.df around it.
+
+        Args:
+            name (str): Name of the step, e.g. 'PreProcessing.remove_duplicates'.
+            owner (object, optional): Object with a df attribute to measure.
+        """
+        rows_in, memory_in = self.__frame_stats(getattr(owner, "df", None))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            rows_out, memory_out = self.__frame_stats(getattr(owner, "df", None))
+            self.records.append(
+                {
+                    "name": name,
+                    "start": start - self._origin,
+                    "seconds": end - start,
+                    "rows_in": rows_in,
+                    "rows_out": rows_out,
+                    "memory_before": memory_in,
+                    "memory_after": memory_out,
+                    "peak_rss": _peak_rss_bytes(),
+                    "thread": threading.get_ident(),
+                }
+            )
+
+    def to_frame(self):
+        """Returns every recorded call as a DataFrame, in the order the calls finished."""
+        return pd.DataFrame(self.records)
+
+    def summary(self):
+        """Prints and returns a table of calls, time, rows and memory change per step."""
+        records = self.to_frame()
+        if records.empty:
+            print("No steps recorded")
+            return records
+        records["memory_change"] = records["memory_after"] - records["memory_before"]
+        summary = (
+            records.groupby("name", sort=False)
+            .agg(
+                calls=("seconds", "size"),
+                total_seconds=("seconds", "sum"),
+                max_seconds=("seconds", "max"),
+                rows_in=("rows_in", "first"),
+                rows_out=("rows_out", "last"),
+                memory_change=("memory_change", "sum"),
+                peak_rss=("peak_rss", "max"),
+            )
+            .sort_values("total_seconds", ascending=False)
+            .reset_index()
+        )
+        print(summary.to_string(index=False))
+        return summary
+
+    def to_json(self, path):
+        """Writes the recorded calls to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.records, f, indent=2, default=str)
+
+    def to_chrome_trace(self, path):
+        """Writes the recorded calls in Chrome trace format, viewable in chrome://tracing or Perfetto."""
+        events = [
+            {
+                "name": record["name"],
+                "ph": "X",
+                "ts": record["start"] * 1e6,
+                "dur": record["seconds"] * 1e6,
+                "pid": os.getpid(),
+                "tid": record["thread"],
+                "args": {
+                    key: record[key]
+                    for key in (
+                        "rows_in",
+                        "rows_out",
+                        "memory_before",
+                        "memory_after",
+                        "peak_rss",
+                    )
+                },
+            }
+            for record in self.records
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events}, f)
+
+
+def instrumented(method):
+    """Records calls to method with self.instrumentation, if the object has one."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = getattr(self, "instrumentation", None)
+        if instrumentation is None:
+            return method(self, *args, **kwargs)
+        with instrumentation.record(f"{type(self).__name__}.{method.__name__}", self):
+            return method(self, *args, **kwargs)
+
+    return wrapper
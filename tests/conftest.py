@@ -0,0 +1,18 @@
+import os
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# the modules read ../config/config.yaml when imported, as the notebooks do from notebooks/
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT / "notebooks")
+
+try:
+    from src import ukhsa_colours  # noqa: F401
+except ImportError:
+    # the UKHSA palette is not part of the repo; any colours will do to test the charts
+    ukhsa_colours = types.ModuleType("src.ukhsa_colours")
+    ukhsa_colours.UKHSA_non_text_colours = {"teal": "#00AB8E", "blue": "#00A5DF"}
+    sys.modules["src.ukhsa_colours"] = ukhsa_colours
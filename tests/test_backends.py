@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.backends import PandasBackend, PolarsBackend
+
+pytest.importorskip("polars")
+
+
+def reviews():
+    return pd.DataFrame(
+        {
+            "rating": [5, 1, np.nan, 5, 3, np.nan],
+            "helpful_votes": [1, 2, 3, 2, 2, 1],
+            "review_date": pd.to_datetime(
+                ["2023-01-01", None, "2023-01-02", "2023-01-01", None, "2023-01-03"]
+            ),
+            "app_version": pd.Categorical(["1.0", "1.1", None, "1.0", "1.0", None]),
+            "review_text": ["great", np.nan, "slow", "great", np.nan, "crashes"],
+        }
+    )
+
+
+def assert_same_value(left, right):
+    if isinstance(left, dict):
+        assert list(map(str, left)) == list(map(str, right))
+        for (left_key, left_value), (right_key, right_value) in zip(left.items(), right.items()):
+            # a missing value is keyed by NaN in both backends, never None
+            assert (pd.isna(left_key) and pd.isna(right_key) and right_key is not None) or (
+                left_key == right_key
+            )
+            assert left_value == pytest.approx(right_value)
+    elif pd.isna(left):
+        assert pd.isna(right)
+    elif isinstance(left, float):
+        assert left == pytest.approx(right)
+    else:
+        assert left == right
+
+
+def test_polars_describe_columns_matches_pandas():
+    df = reviews()
+    expected = PandasBackend(df).describe_columns()
+    result = PolarsBackend(df).describe_columns()
+
+    assert list(result) == list(expected)
+    for column, stats in expected.items():
+        assert set(result[column]) == set(stats)
+        for name, value in stats.items():
+            assert_same_value(value, result[column][name])
+
+
+@pytest.mark.parametrize("dropna", [True, False])
+def test_polars_value_counts_match_pandas(dropna):
+    df = reviews()
+    for column in ["rating", "review_text"]:
+        expected = PandasBackend(df).value_counts(column, dropna)
+        result = PolarsBackend(df).value_counts(column, dropna)
+        assert result.tolist() == expected.tolist()
+        assert_same_value(dict(zip(expected.index, expected)), dict(zip(result.index, result)))
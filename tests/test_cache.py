@@ -0,0 +1,26 @@
+import pandas as pd
+
+from cleaning.cache import ParquetCache
+
+
+def test_cached_frame_keeps_its_dtypes(tmp_path):
+    cache = ParquetCache(tmp_path)
+    df = pd.DataFrame(
+        {
+            "review_text": pd.Series(["great app", None], dtype="string[pyarrow]"),
+            "app_version": pd.Categorical(["1.0", "1.1"]),
+            "star_rating": pd.Series([5, 1], dtype="int8"),
+        }
+    )
+    cache.put("key", df, {"note": "kept"})
+
+    cached = cache.get("key")
+    pd.testing.assert_frame_equal(cached, df)
+    assert cached.attrs == {"note": "kept"}
+    assert df.attrs == {}
+
+
+def test_missing_key_counts_as_a_miss(tmp_path):
+    cache = ParquetCache(tmp_path)
+    assert cache.get("missing") is None
+    assert cache.stats()["misses"] == 1
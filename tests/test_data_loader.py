@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from cleaning.data_loader import REVIEW_CSV_KWARGS, load_files, load_review_files
+
+MONTHS = {
+    "2023_01": ["Review Text,Star Rating", '"Très bien, merci",5', "crashes,1"],
+    "2023_02": ["Review Text,Star Rating", "slow,2", "bad,line,here", '"ok",4'],
+}
+
+
+@pytest.fixture
+def review_files(tmp_path):
+    paths = []
+    for month, lines in MONTHS.items():
+        path = tmp_path / f"reviews_reviews_uk.nhs.covid19.production_{month}.csv"
+        # the exports are latin-1 with \n line endings
+        path.write_bytes(("\n".join(lines) + "\n").encode("latin-1"))
+        paths.append(path)
+    return paths
+
+
+def test_loader_matches_read_csv(review_files):
+    with pytest.warns(pd.errors.ParserWarning):
+        expected = pd.concat(
+            [pd.read_csv(path, **REVIEW_CSV_KWARGS) for path in review_files], ignore_index=True
+        )
+    df, load_stats = load_files(review_files, max_workers=2)
+
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.loc[0, "Review Text"] == "Très bien, merci"
+    assert load_stats["rows"].tolist() == [2, 2]
+    assert load_stats["bad_lines"].tolist() == [0, 1]
+
+
+def test_review_files_are_read_in_name_order(review_files, tmp_path):
+    df, load_stats = load_review_files(data_folder=tmp_path, max_workers=1)
+    assert load_stats["file"].tolist() == [path.name for path in review_files]
+    assert df["Review Text"].tolist() == ["Très bien, merci", "crashes", "slow", "ok"]
+
+
+def test_missing_files_raise(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_review_files(data_folder=tmp_path)
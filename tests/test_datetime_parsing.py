@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+import cleaning.datetime_parsing as datetime_parsing
+from cleaning.datetime_parsing import DatetimeParser
+
+
+@pytest.fixture
+def guesses(monkeypatch):
+    calls = []
+    guess = datetime_parsing.guess_datetime_format
+
+    def counting_guess(value):
+        calls.append(value)
+        return guess(value)
+
+    monkeypatch.setattr(datetime_parsing, "guess_datetime_format", counting_guess)
+    return calls
+
+
+def dates(values):
+    return pd.Series(values, name="Review Date")
+
+
+def test_parses_each_distinct_value_like_to_datetime():
+    series = dates(["2023-01-02 10:00:00", None, "2023-01-02 10:00:00", "2023-02-01 09:30:00"])
+    parsed = DatetimeParser().parse(series)
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(series))
+
+
+def test_format_is_reused_for_the_same_frame_version(guesses):
+    parser = DatetimeParser()
+    parser.parse(dates(["02/01/2023", "03/01/2023"]), version=1)
+    parser.parse(dates(["04/01/2023"]), version=1)
+    parser.components("Review Date", dates(["05/01/2023"]), {"year": True}, version=1)
+    assert guesses == ["02/01/2023"]
+
+
+def test_format_is_inferred_again_for_a_new_frame(guesses):
+    parser = DatetimeParser()
+    assert parser.parse(dates(["25/12/2023"]), version=1)[0] == pd.Timestamp("2023-12-25")
+    # another file whose column of the same name is month first; the day-first format
+    # remembered for the first file would also parse it, as 1 February
+    parsed = parser.parse(dates(["01/02/2024", "12/25/2023"]), version=2)
+    assert parsed.tolist() == [pd.Timestamp("2024-01-02"), pd.Timestamp("2023-12-25")]
+    assert len(guesses) == 2
+
+
+def test_remembered_format_falls_back_on_a_mismatch(guesses):
+    parser = DatetimeParser()
+    parser.parse(dates(["2023-01-02"]), version=1)
+    parsed = parser.parse(dates(["2023-02-01 10:15"]), version=1)
+    assert parsed[0] == pd.Timestamp("2023-02-01 10:15")
+    assert len(guesses) == 2
+
+
+def test_unparseable_column_is_returned_unchanged():
+    series = dates(["not a date", "2023-01-02"])
+    assert DatetimeParser().parse(series) is series
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from analysis.downsampling import downsample_line, min_max_indices
+
+
+def test_min_max_never_exceeds_n_out():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=1_000)
+    for n_out in range(2, 50):
+        positions = min_max_indices(y, n_out)
+        assert len(positions) <= n_out
+        assert positions[0] == 0 and positions[-1] == len(y) - 1
+
+
+def test_downsample_line_keeps_at_most_max_points():
+    x = pd.Series(np.arange(10_000))
+    y = pd.Series(np.sin(np.arange(10_000) / 50))
+    for method in ("lttb", "minmax"):
+        kept_x, kept_y = downsample_line(x, y, 101, method=method)
+        assert len(kept_x) == len(kept_y) <= 101
+
+
+def test_min_max_keeps_the_extremes():
+    y = np.sin(np.arange(10_000) / 50)
+    kept = y[min_max_indices(y, 101)]
+    assert kept.max() == y.max() and kept.min() == y.min()
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from topic_modelling.embedding_stage import EmbeddingStage, length_bucketed_batches
+
+
+class LengthModel:
+    """Stands in for a SentenceTransformer: the vector of a text is its length and word count."""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size, convert_to_numpy, show_progress_bar):
+        self.batches.append(list(texts))
+        return np.array([[len(text), len(text.split())] for text in texts], dtype=np.float32)
+
+
+TEXTS = ["a much longer review of the app", "ok", "fine app", "", "crashes on start", "good"]
+
+
+def test_batches_cover_every_text_once_grouped_by_length():
+    batches = length_bucketed_batches(TEXTS, batch_size=4)
+    positions = np.concatenate([positions for positions, _ in batches])
+    assert sorted(positions.tolist()) == list(range(len(TEXTS)))
+    lengths = [len(text) for _, texts in batches for text in texts]
+    assert lengths == sorted(lengths)
+    for batch_positions, texts in batches:
+        assert texts == [TEXTS[i] for i in batch_positions]
+
+
+def test_in_process_stage_returns_vectors_in_input_order():
+    model = LengthModel()
+    stage = EmbeddingStage("unused", batch_size=2, processes=1, model=model)
+    vectors = stage(TEXTS)
+
+    assert vectors.tolist() == [[len(text), len(text.split())] for text in TEXTS]
+    assert [len(batch) for batch in model.batches] == [2, 2, 2]
+    assert stage.stats["documents"] == len(TEXTS) and stage.stats["processes"] == 1
+    assert stage([]).shape == (0, 0)
+
+
+def test_spawned_workers_match_in_process_encoding():
+    pytest.importorskip("torch")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    with open("../config/config.yaml") as f:
+        model_path = Path(yaml.safe_load(f)["model_folder"]) / "paraphrase-multilingual-MiniLM-L12-v2"
+    if not model_path.exists():
+        pytest.skip(f"no saved model at {model_path}")
+
+    texts = TEXTS * 10
+    expected = sentence_transformers.SentenceTransformer(str(model_path), device="cpu").encode(
+        texts, convert_to_numpy=True
+    )
+    stage = EmbeddingStage(str(model_path), batch_size=8, processes=2, batches_per_shard=2)
+    try:
+        vectors = stage(texts)
+    finally:
+        stage.close()
+
+    assert stage.stats["processes"] == 2
+    np.testing.assert_allclose(vectors, expected, atol=1e-4)
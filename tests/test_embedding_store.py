@@ -0,0 +1,46 @@
+import numpy as np
+
+from topic_modelling.embedding_store import EmbeddingStore
+
+VECTORS = {"aaa": [1.0, 10.0], "bbb": [2.0, 50.0], "ccc": [3.0, 99.0]}
+
+
+def encode(texts):
+    return np.array([VECTORS[text] for text in texts])
+
+
+def test_embed_reuses_stored_vectors(tmp_path):
+    store = EmbeddingStore("model", folder=tmp_path)
+    store.embed(["aaa", "bbb"], encode)
+
+    reopened = EmbeddingStore("model", folder=tmp_path)
+    calls = []
+    vectors = reopened.embed(["bbb", "aaa"], lambda texts: calls.append(texts) or encode(texts))
+
+    assert calls == []
+    np.testing.assert_array_equal(vectors, [[2, 50], [1, 10]])
+
+
+def test_vectors_written_without_keys_are_dropped(tmp_path):
+    store = EmbeddingStore("model", folder=tmp_path)
+    store.embed(["aaa", "bbb"], encode)
+    # a write interrupted after the vectors but before their keys
+    with open(store.vectors_path, "ab") as f:
+        f.write(np.array([[9, 9]], dtype=store.dtype).tobytes())
+
+    reopened = EmbeddingStore("model", folder=tmp_path)
+    vectors = reopened.embed(["ccc", "aaa", "bbb"], encode)
+
+    np.testing.assert_array_equal(vectors, [[3, 99], [1, 10], [2, 50]])
+    assert len(EmbeddingStore("model", folder=tmp_path)) == 3
+
+
+def test_keys_written_without_vectors_are_dropped(tmp_path):
+    store = EmbeddingStore("model", folder=tmp_path)
+    store.embed(["aaa"], encode)
+    with open(store.keys_path, "ab") as f:
+        f.write(store.key("bbb"))
+
+    reopened = EmbeddingStore("model", folder=tmp_path)
+    assert len(reopened) == 1
+    np.testing.assert_array_equal(reopened.embed(["bbb", "ccc"], encode), [[2, 50], [3, 99]])
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from cleaning.fingerprints import FingerprintStore, row_fingerprints
+
+
+def test_fingerprints_do_not_depend_on_dtypes():
+    as_read = pd.DataFrame({"t": ["x"], "n": [1], "d": pd.to_datetime(["2023-01-01"])})
+    # the same row from a chunk where n has a missing value and the text is Arrow-backed
+    other_chunk = pd.DataFrame(
+        {
+            "t": pd.Series(["x", None], dtype="string[pyarrow]"),
+            "n": [1.0, np.nan],
+            "d": pd.to_datetime(["2023-01-01", None]).as_unit("s"),
+        }
+    )
+    categorical = as_read.astype({"t": "category", "n": "Int8"})
+
+    assert row_fingerprints(as_read)[0] == row_fingerprints(other_chunk)[0]
+    assert row_fingerprints(as_read)[0] == row_fingerprints(categorical)[0]
+
+
+def test_large_integers_keep_distinct_fingerprints():
+    df = pd.DataFrame({"id": [2**60, 2**60 + 1]})
+    assert len(set(row_fingerprints(df))) == 2
+
+
+def test_store_flags_rows_seen_in_earlier_batches():
+    store = FingerprintStore()
+    first = row_fingerprints(pd.DataFrame({"t": ["a", "b", "a"]}))
+    second = row_fingerprints(pd.DataFrame({"t": ["c", "b"]}))
+
+    assert store.add(first).tolist() == [False, False, True]
+    assert store.add(second).tolist() == [False, True]
+    assert len(store) == 3
+
+
+def test_store_persists_between_runs(tmp_path):
+    path = tmp_path / "fingerprints.npy"
+    store = FingerprintStore(path)
+    store.add(row_fingerprints(pd.DataFrame({"t": ["a", "b"], "n": [1, 2]})))
+    store.save()
+
+    reloaded = FingerprintStore(path)
+    later_file = pd.DataFrame({"t": ["b", "c"], "n": [2.0, np.nan]})
+    assert len(reloaded) == 2
+    assert reloaded.contains(row_fingerprints(later_file)).tolist() == [True, False]
+
+
+def test_store_matches_a_set_over_many_batches():
+    rng = np.random.default_rng(0)
+    store, seen = FingerprintStore(), set()
+    for _ in range(40):
+        batch = rng.integers(0, 5_000, 300).astype(np.uint64)
+        expected = []
+        for value in batch.tolist():
+            expected.append(value in seen)
+            seen.add(value)
+        assert store.add(batch).tolist() == expected
+    assert len(store) == len(seen)
+    assert store.fingerprints.tolist() == sorted(seen)
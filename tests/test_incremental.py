@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("gensim")
+
+from topic_modelling.incremental import IncrementalLDA, StableTopicIds  # noqa: E402
+
+
+def month(words, rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(words[i % len(words)], 8)) for i in range(rows)]
+
+
+APP = "crash phone battery update bluetooth notification".split()
+VENUE = "venue checkin poster scan restaurant pub".split()
+TESTS = "test result positive negative isolation symptoms".split()
+
+
+def test_stable_topic_ids_follow_the_words():
+    ids = StableTopicIds(min_similarity=0.5)
+    assert ids.assign({0: {"crash": 0.6, "phone": 0.4}, 1: {"venue": 0.7, "scan": 0.3}}) == {
+        0: 0,
+        1: 1,
+    }
+    # the next month the model lists the same topics the other way round, plus a new one
+    mapping = ids.assign(
+        {0: {"venue": 0.6, "scan": 0.4}, 1: {"crash": 0.5, "battery": 0.5}, 2: {"test": 1.0}}
+    )
+    assert mapping == {0: 1, 1: 0, 2: 2}
+
+    restored = StableTopicIds.from_dict(ids.to_dict())
+    assert restored.assign({0: {"test": 0.9, "result": 0.1}}) == {0: 2}
+
+
+def test_lda_update_grows_the_vocabulary_and_reloads(tmp_path):
+    model = IncrementalLDA(tmp_path, num_topics=2, num_words=4)
+    first = model.update(month([APP, VENUE]))
+    assert [name for name, _ in first] == ["Topic 0", "Topic 1"]
+    terms = len(model.dictionary)
+
+    # a new run loads the saved model and updates it with the next month's reviews
+    reloaded = IncrementalLDA(tmp_path, num_topics=2, num_words=4)
+    assert reloaded.model is not None and len(reloaded.dictionary) == terms
+    second = reloaded.update(month([APP, TESTS], seed=1))
+
+    assert len(reloaded.dictionary) > terms
+    assert reloaded.model.num_terms == len(reloaded.dictionary)
+    assert reloaded.model.state.sstats.shape == (2, len(reloaded.dictionary))
+    # every topic still gets its own stable id, carried over from the saved run
+    assert len({name for name, _ in second}) == 2
+    assert reloaded.topic_ids.next_id >= 2
+    # the new month's words can be drawn by the topics
+    positive = reloaded.dictionary.token2id["positive"]
+    assert (reloaded.model.get_topics()[:, positive] > 0).all()
+
+
+def test_bertopic_partial_fit_keeps_topic_ids(tmp_path):
+    pytest.importorskip("bertopic")
+    pytest.importorskip("sklearn")
+    from topic_modelling.incremental import IncrementalBERTopic
+
+    rng = np.random.default_rng(0)
+    documents = month([APP, VENUE, TESTS], rows=90)
+    centres = rng.normal(size=(3, 16))
+    embeddings = np.vstack([centres[i % 3] + rng.normal(scale=0.05, size=16) for i in range(90)])
+
+    model = IncrementalBERTopic(tmp_path, n_clusters=3)
+    info = model.update(documents, embeddings)
+    assert "Stable Topic" in info and info["Stable Topic"].nunique() == len(info)
+
+    reloaded = IncrementalBERTopic(tmp_path, n_clusters=3)
+    again = reloaded.update(documents, embeddings)
+    assert sorted(again["Stable Topic"]) == sorted(info["Stable Topic"])
@@ -0,0 +1,67 @@
+import json
+import time
+
+import pandas as pd
+
+from src.instrumentation import Instrumentation, _rss_bytes, instrumented
+
+
+class Cleaner:
+    def __init__(self, df, instrumentation=None):
+        self.df = df
+        self.instrumentation = instrumentation
+
+    @instrumented
+    def drop_first_row(self):
+        time.sleep(0.02)
+        self.df = self.df.iloc[1:]
+        return len(self.df)
+
+    @instrumented
+    def run(self):
+        self.drop_first_row()
+        return self.drop_first_row()
+
+
+def test_instrumented_methods_record_spans_and_export_a_chrome_trace(tmp_path):
+    instrumentation = Instrumentation()
+    cleaner = Cleaner(pd.DataFrame({"x": range(10)}), instrumentation)
+    assert cleaner.run() == 8
+
+    records = instrumentation.to_frame()
+    # spans are recorded as they finish, so the outer call comes last
+    assert records["name"].tolist() == [
+        "Cleaner.drop_first_row",
+        "Cleaner.drop_first_row",
+        "Cleaner.run",
+    ]
+    assert records["rows_in"].tolist() == [10, 9, 10]
+    assert records["rows_out"].tolist() == [9, 8, 8]
+    assert (records["seconds"].iloc[:2] >= 0.02).all()
+    assert records["seconds"].iloc[2] >= records["seconds"].iloc[:2].sum()
+    assert records["start"].iloc[2] <= records["start"].iloc[0]
+
+    summary = instrumentation.summary()
+    assert summary.set_index("name").loc["Cleaner.drop_first_row", "calls"] == 2
+
+    path = tmp_path / "trace.json"
+    instrumentation.to_chrome_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == records["name"].tolist()
+    for event, record in zip(events, instrumentation.records):
+        assert event["ph"] == "X"
+        assert set(event) == {"name", "ph", "ts", "dur", "pid", "tid", "args"}
+        assert event["dur"] == record["seconds"] * 1e6 and event["ts"] == record["start"] * 1e6
+        assert event["args"]["rows_in"] == record["rows_in"]
+
+
+def test_methods_run_unrecorded_without_instrumentation():
+    cleaner = Cleaner(pd.DataFrame({"x": range(3)}))
+    assert cleaner.drop_first_row() == 2
+
+
+def test_current_rss_grows_with_an_allocation():
+    before = _rss_bytes()
+    block = bytearray(64 * 1024 * 1024)
+    block[::4096] = b"x" * len(block[::4096])  # touch every page so it is resident
+    assert _rss_bytes() - before >= 32 * 1024 * 1024
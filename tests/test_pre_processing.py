@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+# the profiling engines are imported with the module
+pytest.importorskip("dataprep.eda")
+pytest.importorskip("sweetviz")
+
+from cleaning.cache import ParquetCache  # noqa: E402
+from cleaning.fingerprints import FingerprintStore  # noqa: E402
+from cleaning.pre_processing_class import PreProcessing, StreamingPreProcessing  # noqa: E402
+
+
+def reviews():
+    return pd.DataFrame(
+        {
+            "Review Text": [" Great APP ", "crashes", "great app", "crashes", None, "Slow "],
+            "Star Rating": [5, 1, 5, 1, 3, np.nan],
+            "App Version": ["1.0", "1.1", "1.0", "1.1", "1.1", None],
+            "Review Date": [
+                "2023-01-02", "2023-01-03", "2023-01-02", "2023-01-03", "2023-01-05", "2023-02-01"
+            ],
+        }
+    )
+
+
+def run_steps(preprocessor):
+    preprocessor.clean_column_names()
+    preprocessor.lowercase_strip_rows(["review_text"])
+    preprocessor.remove_duplicates()
+    preprocessor.fill_or_remove_missing_values(
+        {"app_version": "missing", "star_rating": "remove_row"}
+    )
+    preprocessor.convert_datatype({"star_rating": "integer"})
+    preprocessor.convert_to_datetime({"review_date": "%Y-%m-%d"})
+    preprocessor.extract_date_info(["review_date"], {"year": True, "month": True})
+
+
+def test_lazy_plan_matches_eager_methods():
+    eager = PreProcessing(reviews())
+    run_steps(eager)
+
+    lazy = PreProcessing(reviews(), lazy=True)
+    run_steps(lazy)
+    assert len(lazy.plan) == 7
+    result = lazy.execute()
+
+    pd.testing.assert_frame_equal(result, eager.df)
+
+
+def test_streaming_removes_duplicates_across_chunks(tmp_path):
+    df = reviews()
+    chunks = [df.iloc[:2], df.iloc[2:4], df.iloc[4:]]
+    streaming = StreamingPreProcessing(chunks)
+    streaming.clean_column_names()
+    streaming.lowercase_strip_rows(["review_text"])
+    streaming.remove_duplicates(subset=["review_text", "star_rating"])
+    output = streaming.execute(tmp_path / "cleaned.csv")
+
+    cleaned = pd.read_csv(output)
+    assert list(cleaned.columns) == ["review_text", "star_rating", "app_version", "review_date"]
+    assert cleaned["review_text"].tolist()[:2] == ["great app", "crashes"]
+    assert len(cleaned) == 4
+    assert streaming.duplicates_dropped == 2
+
+
+def test_streaming_dedupes_against_a_saved_store(tmp_path):
+    store = FingerprintStore(tmp_path / "fingerprints.npy")
+    first = StreamingPreProcessing([reviews().iloc[:3]])
+    first.remove_duplicates(subset=["Review Text", "Star Rating"], store=store)
+    first.execute(tmp_path / "first.csv")
+    store.save()
+
+    # the next month's file has the int ratings read as floats
+    second = StreamingPreProcessing([reviews().iloc[1:4].astype({"Star Rating": float})])
+    second.remove_duplicates(
+        subset=["Review Text", "Star Rating"], store=FingerprintStore(store.path)
+    )
+    second.execute(tmp_path / "second.csv")
+
+    # two rows were kept last month and the third repeats one of them
+    assert second.duplicates_dropped == 3
+
+
+def test_streaming_report_is_not_available():
+    with pytest.raises(NotImplementedError):
+        StreamingPreProcessing([reviews()]).get_dataframe_report()
+
+
+def test_cache_hit_restores_memory_report(tmp_path):
+    path = tmp_path / "reviews.csv"
+    reviews().to_csv(path, index=False)
+    cache = ParquetCache(tmp_path / "cache")
+
+    def clean():
+        # without a DataFrame the steps are planned until execute() reads the file
+        preprocessor = PreProcessing(None, source_files=[path], cache=cache)
+        preprocessor.remove_duplicates()
+        preprocessor.convert_datatype("auto")
+        return preprocessor, preprocessor.execute()
+
+    first, cleaned = clean()
+    second, cached = clean()
+
+    assert cache.stats()["hits"] == 1
+    pd.testing.assert_frame_equal(cached, cleaned)
+    pd.testing.assert_frame_equal(second.memory_report, first.memory_report)
+
+
+def test_sweetviz_shows_only_the_final_report(monkeypatch):
+    shown = []
+
+    class Report:
+        def __init__(self, df):
+            self.rows = len(df)
+
+        def show_notebook(self):
+            shown.append(self.rows)
+
+    monkeypatch.setattr("cleaning.pre_processing_class.sv.analyze", Report)
+    df = pd.concat([reviews()] * 50, ignore_index=True)
+    preprocessor = PreProcessing(df)
+    report = preprocessor.get_dataframe_report(time_budget=60, engine="sweetviz", pilot_rows=10)
+
+    assert shown == [report.rows] and report.rows > 10
+    # the pilot size is part of the cache key
+    other = preprocessor.get_dataframe_report(time_budget=60, engine="sweetviz", pilot_rows=20)
+    assert other is not report
+
+
+def test_plan_fuses_row_filters_and_column_drops():
+    lazy = PreProcessing(reviews(), lazy=True)
+    lazy.remove_duplicates()
+    lazy.fill_or_remove_missing_values({"Star Rating": "remove_row", "App Version": "remove_col"})
+    plan = lazy.explain()
+    assert "2 row filter(s)" in plan and "dropping ['App Version']" in plan
+
+    result = lazy.execute()
+    assert lazy.plan == []
+    assert list(result.columns) == ["Review Text", "Star Rating", "Review Date"]
+    assert result.index.tolist() == [0, 1, 2, 4]
+
+
+def test_methods_outside_the_plan_run_it_first():
+    lazy = PreProcessing(reviews(), lazy=True)
+    lazy.remove_duplicates()
+    report = lazy.get_dataframe_report(engine="basic")
+
+    assert lazy.plan == []
+    # only the second "crashes" row is an exact duplicate
+    assert len(lazy.df) == 5
+    assert len(report) == 4
+
+
+def test_remove_duplicates_returns_counts_in_every_mode():
+    eager = PreProcessing(reviews())
+    assert eager.remove_duplicates() == (1, eager.df.index)
+    hashed = PreProcessing(reviews())
+    number_dropped, kept_index = hashed.remove_duplicates(method="hash")
+    assert number_dropped == 1 and kept_index.tolist() == [0, 1, 2, 4, 5]
+
+    lazy = PreProcessing(reviews(), lazy=True)
+    lazy.remove_duplicates(method="hash")
+    lazy.remove_duplicates(subset=["Star Rating"], store=FingerprintStore())
+    lazy.execute()
+    # the first step drops row 3 and the second row 2, which repeats the rating 5
+    assert lazy.duplicates_dropped == 2
+    assert lazy.kept_index.tolist() == [0, 1, 4, 5]
+
+
+def test_cache_is_bypassed_when_a_store_needs_the_rows(tmp_path):
+    path = tmp_path / "reviews.csv"
+    reviews().to_csv(path, index=False)
+    cache = ParquetCache(tmp_path / "cache")
+
+    for _ in range(2):
+        store = FingerprintStore()
+        preprocessor = PreProcessing(None, source_files=[path], cache=cache)
+        preprocessor.remove_duplicates(store=store)
+        preprocessor.execute()
+        assert len(store) == 5
+
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.parametrize("unique_values", [False, True])
+@pytest.mark.parametrize("dtype", [object, "string[python]", "string[pyarrow]", "category"])
+def test_lowercase_strip_rows_keeps_the_dtype(unique_values, dtype):
+    texts = pd.Series([" Great APP ", "crashes", None, "great app"], dtype=dtype)
+    preprocessor = PreProcessing(pd.DataFrame({"Review Text": texts}))
+    preprocessor.lowercase_strip_rows(["Review Text"], unique_values=unique_values)
+
+    cleaned = preprocessor.df["Review Text"]
+    if dtype == "category":
+        # the categories themselves are cleaned
+        assert cleaned.cat.categories.tolist() == ["great app", "crashes"]
+    else:
+        assert cleaned.dtype == texts.dtype
+    assert cleaned.tolist()[:2] == ["great app", "crashes"] and pd.isna(cleaned[2])
+    assert cleaned[3] == "great app"
+
+
+def survey(rows=1_000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Star Rating": rng.integers(1, 6, rows),
+            "Helpful Votes": rng.integers(0, 100_000, rows),
+            "Score": rng.integers(0, 10, rows) / 2,
+            "Sentiment": rng.normal(size=rows),
+            "App Version": rng.choice(["1.0", "1.1", "1.2"], rows),
+            "Review Text": [f"review number {i}" for i in range(rows)],
+            # too many distinct values for a categorical, and not all strings
+            "Mixed": [i if i % 2 else str(i) for i in range(rows)],
+            "Recommended": rng.random(rows) < 0.5,
+        }
+    )
+
+
+def test_auto_datatypes_shrink_without_changing_values():
+    df = survey()
+    preprocessor = PreProcessing(df.copy())
+    report = preprocessor.convert_datatype("auto")
+    result = preprocessor.df
+
+    assert result.dtypes.astype(str).to_dict() == {
+        "Star Rating": "int8",
+        "Helpful Votes": "int32",
+        "Score": "float32",
+        # float32 would round these
+        "Sentiment": "float64",
+        "App Version": "category",
+        "Review Text": "string",
+        "Mixed": "object",
+        "Recommended": "bool",
+    }
+    assert result["Review Text"].dtype.storage == "pyarrow"
+    for column in df.columns:
+        assert result[column].astype(object).tolist() == df[column].astype(object).tolist()
+
+    assert report is preprocessor.memory_report
+    assert report["column_name"].tolist() == list(df.columns)
+    assert report["before_dtype"].tolist() == df.dtypes.astype(str).tolist()
+    assert report["after_dtype"].tolist() == result.dtypes.astype(str).tolist()
+    assert report["after_bytes"].tolist() == result.memory_usage(index=False, deep=True).tolist()
+    assert (report["after_bytes"] <= report["before_bytes"]).all()
+    assert report["reduction"].tolist() == pytest.approx(
+        (report["before_bytes"] / report["after_bytes"]).tolist()
+    )
+
+
+def test_lazy_auto_datatypes_match_eager():
+    eager = PreProcessing(survey())
+    eager.convert_datatype("auto", category_ratio=0.001)
+    lazy = PreProcessing(survey(), lazy=True)
+    lazy.convert_datatype("auto", category_ratio=0.001)
+
+    pd.testing.assert_frame_equal(lazy.execute(), eager.df)
+    pd.testing.assert_frame_equal(lazy.memory_report, eager.memory_report)
+    # too many distinct versions for the ratio, so they are Arrow strings instead
+    assert str(eager.df["App Version"].dtype) == "string"
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from analysis.backends import PandasBackend, describe_series
+from analysis.sketches import (
+    ColumnSketch,
+    FrameSketch,
+    HeavyHitters,
+    HyperLogLog,
+    QuantileSketch,
+    describe_chunks,
+)
+
+
+def test_hyperloglog_is_within_its_error_bound():
+    distinct = 200_000
+    values = pd.Series(np.arange(distinct).repeat(2))
+    hll = HyperLogLog(precision=12)
+    hll.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    # four standard errors of 1.04 / sqrt(2**12)
+    assert abs(hll.estimate() - distinct) / distinct < 4 * 1.04 / np.sqrt(2**12)
+
+
+def test_quantile_sketch_rank_error_is_small():
+    values = np.random.default_rng(0).lognormal(size=200_000)
+    sketch = QuantileSketch(k=256)
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+
+    ordered = np.sort(values)
+    for q, estimate in zip([0.25, 0.5, 0.75], sketch.quantiles([0.25, 0.5, 0.75])):
+        rank = np.searchsorted(ordered, estimate) / len(values)
+        assert abs(rank - q) < 0.02
+        assert abs(rank - np.mean(values <= np.quantile(values, q))) < 0.02
+
+
+def test_heavy_hitters_stay_within_the_misra_gries_bound():
+    values = pd.Series(np.random.default_rng(0).zipf(1.5, size=100_000) % 5_000)
+    hitters = HeavyHitters(capacity=100)
+    for start in range(0, len(values), 10_000):
+        hitters.update(values.iloc[start : start + 10_000])
+
+    true_counts = values.value_counts()
+    assert not hitters.is_exact()
+    assert hitters.error <= hitters.total / (hitters.capacity + 1)
+    for value, estimate in hitters.counts.items():
+        assert true_counts[value] - hitters.error <= estimate <= true_counts[value]
+    # every value more frequent than the error is kept
+    assert set(true_counts[true_counts > hitters.error].index) <= set(hitters.counts.index)
+
+
+def test_merged_sketches_match_one_sketch_over_all_rows():
+    rng = np.random.default_rng(0)
+    first = pd.Series(np.where(rng.random(5_000) < 0.1, np.nan, rng.integers(0, 50, 5_000)))
+    second = pd.Series(rng.integers(20, 80, 7_000).astype(float))
+
+    merged = ColumnSketch().update(first).merge(ColumnSketch().update(second)).summary()
+    whole = ColumnSketch().update(pd.concat([first, second], ignore_index=True)).summary()
+
+    for key in ["count_of_entries_wo_na", "nan_count", "count_of_uniques_wo_na", "min", "max"]:
+        assert merged[key] == whole[key]
+    assert np.isclose(merged["mean"], whole["mean"]) and np.isclose(merged["std"], whole["std"])
+    assert merged["proportion_count_with_na"] == whole["proportion_count_with_na"]
+    assert merged["50%"] == whole["50%"]
+
+
+def test_exact_sketch_matches_describe_series():
+    df = pd.DataFrame(
+        {
+            "rating": [5, 1, 5, np.nan, 3, 5],
+            "app": ["a", "b", "a", None, "c", "a"],
+            "date": pd.to_datetime(
+                ["2023-01-01", None, "2023-01-02", "2023-01-02", None, "2023-01-03"]
+            ),
+        }
+    )
+    # the same rows in two chunks, as describe_chunks reads a large file
+    described = describe_chunks([df.iloc[:3], df.iloc[3:]]).set_index("column_name")
+    whole = FrameSketch().update(df).to_frame()
+
+    assert list(whole.columns)[:3] == ["column_name", "data_type", "count_of_entries_with_na"]
+    for column in df.columns:
+        expected = describe_series(df[column])
+        for key in [
+            "count_of_entries_wo_na",
+            "nan_count",
+            "count_of_uniques_with_na",
+            "count_of_uniques_wo_na",
+            "min",
+            "max",
+        ]:
+            value = described.loc[column, key]
+            assert (pd.isna(value) and pd.isna(expected[key])) or value == expected[key]
+        assert described.loc[column, "proportion_count_wo_na"] == expected["proportion_count_wo_na"]
+    assert described.loc["rating", "mean"] == df["rating"].mean()
+    assert described.loc["rating", "50%"] == df["rating"].median()
+
+
+def test_pandas_backend_batches_are_bounded():
+    df = pd.DataFrame({"x": range(25)})
+    batches = list(PandasBackend(df).batches(rows=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    pd.testing.assert_frame_equal(pd.concat(batches), df)
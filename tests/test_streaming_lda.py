@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("gensim")
+
+from topic_modelling.streaming_lda import DocumentStream, streaming_topic_modeling  # noqa: E402
+
+APP_WORDS = "crash phone battery update bluetooth notification".split()
+VENUE_WORDS = "venue checkin poster scan café restaurant".split()
+
+
+def write_reviews(path, rows=200):
+    rng = np.random.default_rng(0)
+    lines = ["Review Text,Star Rating"]
+    for i in range(rows):
+        words = rng.choice(APP_WORDS if i % 2 else VENUE_WORDS, 8)
+        lines.append(f'"{" ".join(words)}",{i % 5 + 1}')
+    # the exports are latin-1 with \n line endings
+    path.write_bytes(("\n".join(lines) + "\n").encode("latin-1"))
+    return path
+
+
+def test_document_stream_reads_latin_1_csvs_on_every_pass(tmp_path):
+    documents = DocumentStream(write_reviews(tmp_path / "reviews.csv"), "Review Text", chunksize=50)
+    first, second = list(documents), list(documents)
+    assert len(first) == 200 and first == second
+    assert any("café" in tokens for tokens in first)
+
+
+def test_csv_column_is_required(tmp_path):
+    with pytest.raises(TypeError):
+        DocumentStream(tmp_path / "reviews.csv")
+
+
+def test_topics_separate_the_two_vocabularies(tmp_path):
+    path = write_reviews(tmp_path / "reviews.csv")
+    topics = streaming_topic_modeling(
+        path, column="Review Text", num_topics=2, num_words=3, workers=1, no_below=2, passes=5
+    )
+
+    assert [name for name, _ in topics] == ["Topic 0", "Topic 1"]
+    top_words = [set(words) for _, words in topics]
+    assert {frozenset(words <= set(APP_WORDS) for words in top_words)} == {frozenset({True, False})}
+    # without a folder the dictionary and corpus go to a temporary folder, not the data folder
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["reviews.csv"]
+
+
+def test_folder_keeps_the_dictionary_and_corpus(tmp_path):
+    path = tmp_path / "reviews.txt"
+    path.write_text("\n".join(["crash phone battery"] * 20 + ["venue checkin scan"] * 20))
+    streaming_topic_modeling(path, num_topics=2, workers=1, no_below=2, folder=tmp_path / "lda")
+    assert {"reviews.dict", "reviews.mm"} <= {p.name for p in (tmp_path / "lda").iterdir()}
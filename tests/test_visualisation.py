@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.visualisation_class import Visualisation
+
+
+def reviews():
+    return pd.DataFrame(
+        {
+            "Star Rating": [5, 1, np.nan, 5, 3, np.nan, 4, 5],
+            "Helpful Votes": [1, 2, 3, 2, 2, 1, 0, 7],
+            "Review Date": pd.to_datetime(
+                [
+                    "2023-01-01",
+                    None,
+                    "2023-01-02",
+                    "2023-01-01",
+                    None,
+                    "2023-02-03",
+                    "2023-02-01",
+                    "2023-02-01",
+                ]
+            ),
+            "App Version": pd.Categorical(["1.0", "1.1", None, "1.0", "1.0", None, "1.1", "1.2"]),
+            "Review Text": ["great", np.nan, "slow", "great", np.nan, "crashes", "ok", "great"],
+        }
+    )
+
+
+def describe_columns_before_single_pass(df):
+    """describe_columns as it was computed before, one DataFrame-wide pass per statistic."""
+
+    def range_stat(name):
+        return df.apply(
+            lambda col: getattr(col, name)()
+            if pd.api.types.is_numeric_dtype(col) or pd.api.types.is_datetime64_any_dtype(col)
+            else pd.NA
+        )
+
+    column_info_dict = {
+        "data_type": df.dtypes,
+        "count_of_entries_with_na": df.shape[0],
+        "count_of_entries_wo_na": df.count(),
+        "nan_count": df.isnull().sum(),
+        "count_of_uniques_with_na": df.nunique(dropna=False),
+        "count_of_uniques_wo_na": df.nunique(dropna=True),
+        "proportion_count_with_na": df.apply(
+            lambda col: col.value_counts(normalize=True, dropna=False).to_dict()
+        ),
+        "proportion_count_wo_na": df.apply(
+            lambda col: col.value_counts(normalize=True, dropna=True).to_dict()
+        ),
+        "mean": df.mean(numeric_only=True),
+        "std": df.std(numeric_only=True),
+        "min": range_stat("min"),
+        "25%": df.quantile(0.25, numeric_only=True),
+        "50%": df.quantile(0.50, numeric_only=True),
+        "75%": df.quantile(0.75, numeric_only=True),
+        "max": range_stat("max"),
+    }
+    return pd.DataFrame(column_info_dict).reset_index().rename(columns={"index": "column_name"})
+
+
+def assert_same_value(left, right):
+    if isinstance(right, dict):
+        assert list(map(str, left)) == list(map(str, right))
+        assert list(left.values()) == pytest.approx(list(right.values()))
+    elif pd.isna(right):
+        assert pd.isna(left)
+    elif isinstance(right, float):
+        assert left == pytest.approx(right)
+    else:
+        assert left == right
+
+
+def assert_same_description(result, expected, fields=None):
+    assert list(result.columns) == list(expected.columns)
+    assert result["column_name"].tolist() == expected["column_name"].tolist()
+    for name in fields or expected.columns:
+        for left, right in zip(result[name], expected[name]):
+            assert_same_value(left, right)
+
+
+def test_describe_columns_matches_the_multi_pass_version():
+    df = reviews()
+    result = Visualisation(df).describe_columns()
+    assert_same_description(result, describe_columns_before_single_pass(df))
+
+
+def test_describe_columns_on_a_thread_pool_matches():
+    df = reviews()
+    assert_same_description(
+        Visualisation(df).describe_columns(max_workers=2), Visualisation(df).describe_columns()
+    )
+
+
+def test_approximate_describe_columns_is_exact_for_few_distinct_values():
+    df = reviews()
+    exact = Visualisation(df).describe_columns()
+    # the exact table lists the columns alphabetically, the sketches in frame order
+    approximate = (
+        Visualisation(df)
+        .describe_columns(approximate=True)
+        .set_index("column_name")
+        .loc[exact["column_name"]]
+        .reset_index()
+    )
+    assert_same_description(
+        approximate,
+        exact,
+        ["count_of_entries_wo_na", "nan_count", "count_of_uniques_wo_na", "mean", "min", "max"],
+    )
+
+
+def bars(fig):
+    return [(trace.name, list(trace.x), list(trace.y)) for trace in fig.data]
+
+
+@pytest.mark.parametrize("dropna", [False, True])
+def test_combined_count_and_proportion_matches_one_figure_per_column(dropna):
+    df = reviews()
+    columns = ["Star Rating", "App Version", "Review Text"]
+    visualiser = Visualisation(df, headless=True)
+
+    figures = visualiser.plot_count_and_proportion(columns, dropna=dropna)
+    combined = visualiser.plot_count_and_proportion(columns, dropna=dropna, combined=True)
+
+    assert len(figures) == len(columns)
+    assert bars(combined) == [bar for fig in figures for bar in bars(fig)]
+    assert combined.layout.height == 400 * len(columns)
+
+    for column, fig in zip(columns, figures):
+        counts = df[column].value_counts(dropna=dropna).sort_index()
+        if not dropna:
+            counts.index = counts.index.fillna("missing").astype(str)
+        (_, count_x, count_y), (_, proportion_x, proportion_y) = bars(fig)
+        assert count_x == counts.index.tolist() and count_y == counts.tolist()
+        assert proportion_x == count_x
+        assert proportion_y == pytest.approx((counts / counts.sum()).tolist())
+
+
+def test_count_and_proportion_does_not_change_the_frame():
+    df = reviews()
+    before = df.copy()
+    Visualisation(df, headless=True).plot_count_and_proportion(list(df.columns), combined=True)
+    pd.testing.assert_frame_equal(df, before)
+
+
+def daily_scores(n_rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "day": np.arange(n_rows),
+            "score": np.sin(np.arange(n_rows) / 100) + rng.normal(scale=0.1, size=n_rows),
+            "platform": np.where(np.arange(n_rows) % 3 == 0, "ios", "android"),
+        }
+    )
+
+
+def test_z_column_gives_one_trace_per_value_in_order_of_appearance():
+    df = daily_scores(30).iloc[::-1]
+    fig = Visualisation(df, headless=True).custom_graph(
+        df, "day", {"score": "bar"}, z_column="platform"
+    )
+
+    # reversed, the first row is an android one
+    assert [trace.name for trace in fig.data] == ["platform=android", "platform=ios"]
+    for trace, platform in zip(fig.data, ["android", "ios"]):
+        rows = df[df["platform"] == platform]
+        assert list(trace.x) == rows["day"].tolist() and list(trace.y) == rows["score"].tolist()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "polars"])
+def test_z_column_of_self_df_is_read_through_the_backend(backend):
+    if backend == "polars":
+        pytest.importorskip("polars")
+    df = daily_scores(30)
+    fig = Visualisation(df, headless=True, backend=backend).custom_graph(
+        None, "day", {"score": "bar"}, z_column="platform"
+    )
+    assert [len(trace.x) for trace in fig.data] == [10, 20]
+
+
+def test_long_lines_are_downsampled_and_drawn_with_webgl():
+    df = daily_scores(50_000)
+    visualiser = Visualisation(df, headless=True)
+
+    fig = visualiser.custom_graph(df, "day", {"score": "line"}, max_points=1_000)
+    (trace,) = fig.data
+    assert trace.type == "scatter" and len(trace.x) <= 1_000
+    assert trace.x[0] == 0 and trace.x[-1] == len(df) - 1
+
+    fig = visualiser.custom_graph(df, "day", {"score": "line"}, max_points=20_000)
+    assert fig.data[0].type == "scattergl" and len(fig.data[0].x) <= 20_000
+
+    fig = visualiser.custom_graph(
+        df, "day", {"score": "line"}, z_column="platform", downsample="minmax", max_points=500
+    )
+    assert [len(trace.x) <= 500 for trace in fig.data] == [True, True]
+    # minmax keeps every bucket's extremes, so the highest score survives
+    assert max(max(trace.y) for trace in fig.data) == df["score"].max()
+
+
+def test_lines_are_kept_whole_without_downsampling():
+    df = daily_scores(12_000)
+    fig = Visualisation(df, headless=True).custom_graph(
+        df, "day", {"score": "line"}, downsample=None
+    )
+    assert fig.data[0].type == "scattergl" and len(fig.data[0].x) == len(df)
+
+
+def monthly_reviews(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Review Submit Month": rng.choice(["2023-01", "2023-02", "2023-03"], n_rows),
+            "App Version": rng.choice(["1.0", "1.1", None], n_rows),
+            "Star Rating": np.where(rng.random(n_rows) < 0.1, np.nan, rng.integers(1, 6, n_rows)),
+        }
+    )
+
+
+def build_cube(df):
+    visualiser = Visualisation(df, headless=True)
+    visualiser.build_rollup(
+        [("Review Submit Month", "App Version"), ("Star Rating",)], measures=["Star Rating"]
+    )
+    return visualiser
+
+
+def test_appended_rollup_matches_a_full_recompute():
+    first, second = monthly_reviews(500), monthly_reviews(300, seed=1)
+    visualiser = build_cube(first)
+    visualiser.append_rows(second)
+    recomputed = build_cube(pd.concat([first, second], ignore_index=True))
+
+    for dimensions in [["Review Submit Month", "App Version"], ["App Version"], ["Star Rating"]]:
+        appended = visualiser.rollup_table(dimensions).sort_values(dimensions, ignore_index=True)
+        expected = recomputed.rollup_table(dimensions).sort_values(dimensions, ignore_index=True)
+        pd.testing.assert_frame_equal(appended, expected, check_dtype=False)
+    assert bars(visualiser.plot_count_and_proportion(["App Version"], show=False)[0]) == bars(
+        recomputed.plot_count_and_proportion(["App Version"], show=False)[0]
+    )
+
+
+def test_rollup_is_rebuilt_after_the_frame_changes():
+    from src.frame_versions import bump_version
+
+    df = monthly_reviews(500)
+    visualiser = build_cube(df)
+    df.loc[df["App Version"] == "1.0", "App Version"] = "1.1"
+    bump_version(df)
+
+    table = visualiser.rollup_table(["App Version"]).set_index("App Version")
+    counts = df["App Version"].value_counts(dropna=False)
+    assert "1.0" not in table.index
+    assert table.loc["1.1", "rows"] == counts["1.1"]
+    assert table["rows"].sum() == len(df)
+
+
+def test_cached_results_follow_the_frame_version():
+    from src.frame_versions import bump_version
+
+    df = reviews()
+    visualiser = Visualisation(df, headless=True)
+    described = visualiser.describe_columns()
+    assert visualiser.describe_columns() is described
+
+    # an in-place change is only noticed once the frame's version is bumped
+    df["Helpful Votes"] = df["Helpful Votes"] * 10
+    assert visualiser.describe_columns() is described
+    bump_version(df)
+    refreshed = visualiser.describe_columns().set_index("column_name")
+    assert refreshed.loc["Helpful Votes", "max"] == 70
+
+    (fig,) = visualiser.plot_count_and_proportion(["Helpful Votes"], show=False)
+    assert list(fig.data[0].x) == ["0", "10", "20", "30", "70"]
+
+    # appended rows change the length, which is noticed without a bump
+    visualiser.append_rows(reviews().iloc[:1])
+    assert visualiser.describe_columns().set_index("column_name").loc[
+        "Star Rating", "count_of_entries_with_na"
+    ] == len(df) + 1
+
+
+def test_token_index_is_rebuilt_after_the_frame_changes():
+    from src.frame_versions import bump_version
+
+    df = reviews()
+    visualiser = Visualisation(df, headless=True)
+    visualiser.build_token_index("Review Text", processes=1)
+    assert visualiser.token_frequencies_by("Review Text", "App Version")["1.0"]["great"] == 2
+
+    df.loc[0, "Review Text"] = "slow"
+    bump_version(df)
+    assert visualiser.token_frequencies_by("Review Text", "App Version")["1.0"]["great"] == 1
@@ -0,0 +1,166 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# the model of each worker process, loaded once by _init_worker
+_worker_model = None
+
+
+def _load_model(model_path):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_path, device="cpu")
+
+
+def _init_worker(model_path, threads):
+    import torch
+
+    # without this every worker starts one thread per core and they fight over the CPUs
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    global _worker_model
+    _worker_model = _load_model(model_path)
+
+
+def _encode(model, texts):
+    return model.encode(
+        texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False
+    )
+
+
+def _encode_shard(shard):
+    """Encodes the batches of one shard in a worker; returns (positions, vectors) per batch."""
+    return [(positions, _encode(_worker_model, texts)) for positions, texts in shard]
+
+
+def length_bucketed_batches(texts, batch_size):
+    """Splits texts into batches of similar length, to cut the padding added to each batch.
+
+    Returns:
+        list: (positions, texts) per batch, where positions are the indexes of the texts.
+    """
+    order = np.argsort([len(text) for text in texts], kind="stable")
+    return [
+        (order[start : start + batch_size], [texts[i] for i in order[start : start + batch_size]])
+        for start in range(0, len(texts), batch_size)
+    ]
+
+
+class EmbeddingStage:
+    def __init__(
+        self,
+        model_path,
+        batch_size=64,
+        processes="auto",
+        threads_per_process=None,
+        batches_per_shard=8,
+        parallel_threshold=5000,
+        model=None,
+    ):
+        """Embeds documents on CPU in length-bucketed batches, sharded across worker processes.
+
+        Call it with a list of texts (it can be passed as encode to EmbeddingStore.embed). After
+        each call self.stats holds the number of documents, seconds and documents per second.
+
+        Args:
+            model_path (str): SentenceTransformer name or local folder, loaded once per worker.
+            batch_size (int, optional): Texts encoded together. Default is 64.
+            processes (int, optional): Worker processes. Default 'auto' uses one per core for calls with
+                                       at least parallel_threshold texts and this process otherwise.
+            threads_per_process (int, optional): torch threads per worker. Default is cores // processes.
+            batches_per_shard (int, optional): Batches sent to a worker at a time. Default is 8.
+            parallel_threshold (int, optional): See processes. Default is 5000, as each worker has to
+                                                load its own copy of the model first.
+            model (SentenceTransformer, optional): An already loaded model for in-process encoding.
+        """
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.processes = processes
+        self.threads_per_process = threads_per_process
+        self.batches_per_shard = batches_per_shard
+        self.parallel_threshold = parallel_threshold
+        self.model = model
+        self.stats = None
+        self._executor = None
+        self._executor_processes = None
+
+    def __processes(self, n_texts):
+        if self.processes == "auto":
+            return os.cpu_count() if n_texts >= self.parallel_threshold else 1
+        return self.processes
+
+    def __executor(self, processes):
+        # kept between calls so the workers' models stay loaded
+        if self._executor is None or self._executor_processes != processes:
+            self.close()
+            threads = self.threads_per_process or max(1, (os.cpu_count() or 1) // processes)
+            self._executor = ProcessPoolExecutor(
+                max_workers=processes,
+                # spawn, as forking a process that has started torch threads can deadlock
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_path, threads),
+            )
+            self._executor_processes = processes
+        return self._executor
+
+    def close(self):
+        """Stops the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __report(self, done, total, start):
+        seconds = time.perf_counter() - start
+        rate = done / seconds if seconds else 0.0
+        print(f"Embedded {done:,}/{total:,} documents ({rate:,.0f} docs/sec)")
+        return seconds, rate
+
+    def __call__(self, texts):
+        texts = [str(text) for text in texts]
+        batches = length_bucketed_batches(texts, self.batch_size)
+        processes = self.__processes(len(texts))
+        vectors = None
+        done = 0
+        start = time.perf_counter()
+
+        def place(positions, batch_vectors):
+            nonlocal vectors, done
+            if vectors is None:
+                vectors = np.empty((len(texts), batch_vectors.shape[1]), dtype=batch_vectors.dtype)
+            vectors[positions] = batch_vectors
+            done += len(positions)
+
+        if processes == 1:
+            if self.model is None:
+                self.model = _load_model(self.model_path)
+            for i, (positions, batch) in enumerate(batches, start=1):
+                place(positions, _encode(self.model, batch))
+                if i % self.batches_per_shard == 0:
+                    self.__report(done, len(texts), start)
+        else:
+            executor = self.__executor(processes)
+            shards = [
+                batches[i : i + self.batches_per_shard]
+                for i in range(0, len(batches), self.batches_per_shard)
+            ]
+            futures = [executor.submit(_encode_shard, shard) for shard in shards]
+            for future in as_completed(futures):
+                for positions, batch_vectors in future.result():
+                    place(positions, batch_vectors)
+                self.__report(done, len(texts), start)
+
+        seconds, rate = self.__report(done, len(texts), start)
+        self.stats = {
+            "documents": len(texts),
+            "seconds": seconds,
+            "docs_per_second": rate,
+            "processes": processes,
+            "batch_size": self.batch_size,
+        }
+        if vectors is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return vectors
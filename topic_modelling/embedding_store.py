@@ -0,0 +1,143 @@
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+with open("../config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+KEY_BYTES = 16
+
+
+def normalise_text(text):
+    """The form of a text that is hashed: Unicode NFC with runs of whitespace collapsed and trimmed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", str(text))).strip()
+
+
+class EmbeddingStore:
+    def __init__(self, model_id, folder=None, dtype="float16"):
+        """A persistent, content-addressed cache of sentence embeddings for one model.
+
+        Each text is keyed by a hash of the model id and its normalised form, so an unchanged review
+        is embedded once however often the topic parameters change. Vectors are appended to a raw
+        file read through a NumPy memmap, and the keys to a second file in the same order.
+
+        Args:
+            model_id (str): The embedding model's name; a different model never shares vectors.
+            folder (str, optional): Where to keep the files. Default is
+                                    data_processed_folder/embeddings/<model_id> from config.yaml.
+            dtype (str, optional): 'float16' (default, half the disk and memory) or 'float32'.
+        """
+        if dtype not in ("float16", "float32"):
+            raise TypeError("dtype must be 'float16' or 'float32'")
+        if folder is None:
+            folder = (
+                Path(config["data_processed_folder"])
+                / "embeddings"
+                / re.sub(r"[^\w.-]", "_", model_id)
+            )
+        self.model_id = model_id
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.folder / "vectors.bin"
+        self.keys_path = self.folder / "keys.bin"
+        self.meta_path = self.folder / "meta.json"
+        self._lock = threading.Lock()
+
+        self.dtype = np.dtype(dtype)
+        self.dimension = None
+        if self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text())
+            if meta["model_id"] != model_id:
+                raise ValueError(f"{self.folder} holds embeddings of {meta['model_id']}, not {model_id}")
+            self.dtype, self.dimension = np.dtype(meta["dtype"]), meta["dimension"]
+        self.__load_index()
+
+    def __load_index(self):
+        keys = self.keys_path.read_bytes() if self.keys_path.exists() else b""
+        rows = len(keys) // KEY_BYTES
+        if self.dimension is None:
+            # no vector has been written yet, so any keys are left from an interrupted first write
+            rows = 0
+        else:
+            row_bytes = self.dimension * self.dtype.itemsize
+            vector_bytes = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+            rows = min(rows, vector_bytes // row_bytes)
+            # a write interrupted between the two files leaves rows in one without the other;
+            # cut both back, so the next append puts a key and its vector at the same row
+            self.__truncate(self.vectors_path, rows * row_bytes)
+        self.__truncate(self.keys_path, rows * KEY_BYTES)
+        keys = keys[: rows * KEY_BYTES]
+        self.index = {
+            keys[i * KEY_BYTES : (i + 1) * KEY_BYTES]: i for i in range(rows)
+        }
+        self._vectors = None
+
+    @staticmethod
+    def __truncate(path, size):
+        if path.exists() and path.stat().st_size > size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+
+    def __len__(self):
+        return len(self.index)
+
+    def key(self, text):
+        digest = hashlib.sha256(f"{self.model_id}\0{normalise_text(text)}".encode("utf-8"))
+        return digest.digest()[:KEY_BYTES]
+
+    def vectors(self):
+        """All stored vectors as a read-only memmap of shape (len(self), dimension)."""
+        if self._vectors is None or len(self._vectors) != len(self):
+            if not len(self):
+                return np.zeros((0, self.dimension or 0), dtype=self.dtype)
+            self._vectors = np.memmap(
+                self.vectors_path, dtype=self.dtype, mode="r", shape=(len(self), self.dimension)
+            )
+        return self._vectors
+
+    def __append(self, keys, vectors):
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+            self.meta_path.write_text(
+                json.dumps(
+                    {"model_id": self.model_id, "dtype": self.dtype.name, "dimension": self.dimension}
+                )
+            )
+        # drop rows left by an append that failed part way in this process
+        self.__truncate(self.vectors_path, len(self.index) * self.dimension * self.dtype.itemsize)
+        self.__truncate(self.keys_path, len(self.index) * KEY_BYTES)
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+        with open(self.keys_path, "ab") as f:
+            f.write(b"".join(keys))
+        for key in keys:
+            self.index[key] = len(self.index)
+
+    def embed(self, texts, encode):
+        """Returns the embeddings of texts, calling encode only for texts not stored yet.
+
+        Args:
+            texts (list): The documents.
+            encode (callable): Embeds a list of texts into a 2D array, e.g.
+                               SentenceTransformer(...).encode or an EmbeddingStage.
+
+        Returns:
+            np.ndarray: float32 array with one row per text, in the order of texts.
+        """
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self.index and key not in missing:
+                    missing[key] = text
+            if missing:
+                print(f"Embedding {len(missing):,} new texts out of {len(texts):,}")
+                self.__append(list(missing), np.asarray(encode(list(missing.values()))))
+            rows = np.fromiter((self.index[key] for key in keys), dtype=np.int64, count=len(keys))
+            return np.asarray(self.vectors()[rows], dtype=np.float32)
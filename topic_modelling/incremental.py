@@ -0,0 +1,205 @@
+import json
+from pathlib import Path
+
+import gensim
+import numpy as np
+from gensim import corpora, models
+from scipy.optimize import linear_sum_assignment
+
+
+def tokenize_document(text):
+    """Lowercase word tokens of one document without gensim's stopwords, as in preprocess_text."""
+    stop_words = gensim.parsing.preprocessing.STOPWORDS
+    return [token for token in gensim.utils.simple_preprocess(str(text)) if token not in stop_words]
+
+
+def _cosine(left, right):
+    dot = sum(weight * right.get(word, 0.0) for word, weight in left.items())
+    norm = np.sqrt(sum(w * w for w in left.values())) * np.sqrt(sum(w * w for w in right.values()))
+    return dot / norm if norm else 0.0
+
+
+class StableTopicIds:
+    def __init__(self, min_similarity=0.5):
+        """Gives topics ids that stay the same from month to month.
+
+        Each month's topics (word -> weight) are matched one-to-one to the topics seen before by
+        cosine similarity of their word weights (Hungarian assignment). A match of at least
+        min_similarity keeps the earlier id; any other topic gets a new id.
+        """
+        self.min_similarity = min_similarity
+        self.signatures = {}
+        self.next_id = 0
+
+    def assign(self, topics):
+        """Returns {model topic id: stable topic id} for topics given as {model topic id: {word: weight}}."""
+        model_ids, stable_ids = list(topics), list(self.signatures)
+        mapping = {}
+        if model_ids and stable_ids:
+            similarity = np.array(
+                [[_cosine(topics[m], self.signatures[s]) for s in stable_ids] for m in model_ids]
+            )
+            for row, col in zip(*linear_sum_assignment(similarity, maximize=True)):
+                if similarity[row, col] >= self.min_similarity:
+                    mapping[model_ids[row]] = stable_ids[col]
+        for model_id in model_ids:
+            if model_id not in mapping:
+                mapping[model_id] = self.next_id
+                self.next_id += 1
+            # the latest words describe the topic from now on
+            self.signatures[mapping[model_id]] = dict(topics[model_id])
+        return mapping
+
+    def to_dict(self):
+        return {
+            "min_similarity": self.min_similarity,
+            "next_id": self.next_id,
+            "signatures": {str(k): v for k, v in self.signatures.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        ids = cls(state["min_similarity"])
+        ids.next_id = state["next_id"]
+        ids.signatures = {int(k): v for k, v in state["signatures"].items()}
+        return ids
+
+
+class IncrementalLDA:
+    def __init__(self, folder, num_topics=5, num_words=10, min_similarity=0.5):
+        """An LDA model that is updated with each month's reviews instead of refitted on all of them.
+
+        The Dictionary grows with new words and the model's topic-word statistics are widened to
+        match, then LdaModel.update trains on the new documents only. The model, dictionary and
+        stable topic ids are saved in folder after each update and loaded again on the next run.
+
+        Args:
+            folder (str): Where the model is kept between runs.
+            num_topics (int, optional): Number of topics, fixed when the model is first created. Default is 5.
+            num_words (int, optional): Words per topic returned by topics(). Default is 10.
+            min_similarity (float, optional): See StableTopicIds. Default is 0.5.
+        """
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.num_topics = num_topics
+        self.num_words = num_words
+        self.dictionary = corpora.Dictionary()
+        self.model = None
+        self.topic_ids = StableTopicIds(min_similarity)
+        if (self.folder / "lda.model").exists():
+            self.dictionary = corpora.Dictionary.load(str(self.folder / "lda.dict"))
+            self.model = models.LdaModel.load(str(self.folder / "lda.model"))
+            self.topic_ids = StableTopicIds.from_dict(
+                json.loads((self.folder / "topic_ids.json").read_text())
+            )
+
+    def __grow_model_vocabulary(self):
+        # new words get the prior and no counts yet; the rest of the model is unchanged
+        added = len(self.dictionary) - self.model.num_terms
+        if added <= 0:
+            return
+        state = self.model.state
+        state.sstats = np.hstack(
+            [state.sstats, np.zeros((self.num_topics, added), dtype=state.sstats.dtype)]
+        )
+        for owner in (self.model, state):
+            owner.eta = np.concatenate(
+                [owner.eta, np.full(added, owner.eta.mean(), dtype=owner.eta.dtype)]
+            )
+        self.model.num_terms = len(self.dictionary)
+        self.model.id2word = self.dictionary
+        self.model.sync_state()
+
+    def update(self, documents):
+        """Trains on new documents (an iterable of texts) and saves the model.
+
+        Returns:
+            list: (stable topic id, top words) for every topic, as perform_topic_modeling returns.
+        """
+        tokens = [tokenize_document(document) for document in documents]
+        self.dictionary.add_documents(tokens)
+        corpus = [self.dictionary.doc2bow(document) for document in tokens]
+        if self.model is None:
+            self.model = models.LdaModel(
+                corpus=corpus, id2word=self.dictionary, num_topics=self.num_topics
+            )
+        else:
+            self.num_topics = self.model.num_topics
+            self.__grow_model_vocabulary()
+            self.model.update(corpus)
+        topics = self.topics()
+        self.save()
+        return topics
+
+    def topics(self):
+        """Returns (stable topic id, top words) per topic, matching topics to earlier months."""
+        words = {
+            topic: dict(self.model.show_topic(topic, topn=self.num_words))
+            for topic in range(self.model.num_topics)
+        }
+        mapping = self.topic_ids.assign(
+            {topic: {w: float(p) for w, p in topic_words.items()} for topic, topic_words in words.items()}
+        )
+        return [(f"Topic {mapping[topic]}", list(words[topic])) for topic in sorted(words)]
+
+    def save(self):
+        self.dictionary.save(str(self.folder / "lda.dict"))
+        self.model.save(str(self.folder / "lda.model"))
+        (self.folder / "topic_ids.json").write_text(json.dumps(self.topic_ids.to_dict()))
+
+
+class IncrementalBERTopic:
+    def __init__(self, folder, n_clusters=20, top_n_words=6, min_similarity=0.5):
+        """A BERTopic model built from online components and updated with partial_fit each month.
+
+        UMAP and HDBSCAN cannot learn incrementally, so IncrementalPCA reduces the embeddings and
+        MiniBatchKMeans clusters them, and an OnlineCountVectorizer grows the vocabulary (decaying
+        old counts slightly). Topic ids are kept stable with StableTopicIds.
+
+        Args:
+            folder (str): Where the model is kept between runs.
+            n_clusters (int, optional): Number of topics. Default is 20.
+            top_n_words (int, optional): Words per topic. Default is 6.
+            min_similarity (float, optional): See StableTopicIds. Default is 0.5.
+        """
+        from bertopic import BERTopic
+        from bertopic.vectorizers import ClassTfidfTransformer, OnlineCountVectorizer
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import IncrementalPCA
+
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.topic_ids = StableTopicIds(min_similarity)
+        if (self.folder / "bertopic").exists():
+            self.model = BERTopic.load(str(self.folder / "bertopic"))
+            self.topic_ids = StableTopicIds.from_dict(
+                json.loads((self.folder / "topic_ids.json").read_text())
+            )
+        else:
+            self.model = BERTopic(
+                umap_model=IncrementalPCA(n_components=5),
+                hdbscan_model=MiniBatchKMeans(n_clusters=n_clusters, random_state=0, n_init=3),
+                vectorizer_model=OnlineCountVectorizer(stop_words="english", decay=0.01),
+                ctfidf_model=ClassTfidfTransformer(bm25_weighting=True, reduce_frequent_words=True),
+                top_n_words=top_n_words,
+            )
+
+    def update(self, documents, embeddings):
+        """Trains on new documents with their embeddings (e.g. from get_registry().embed) and saves the model.
+
+        Returns:
+            pd.DataFrame: get_topic_info() with a 'Stable Topic' column of the matched ids.
+        """
+        self.model.partial_fit(list(documents), embeddings=embeddings)
+        info = self.model.get_topic_info()
+        mapping = self.topic_ids.assign(
+            {
+                topic: {word: float(weight) for word, weight in self.model.get_topic(topic)}
+                for topic in info["Topic"]
+            }
+        )
+        info["Stable Topic"] = info["Topic"].map(mapping)
+        # the online components are not supported by safetensors, so the model is pickled
+        self.model.save(str(self.folder / "bertopic"), serialization="pickle")
+        (self.folder / "topic_ids.json").write_text(json.dumps(self.topic_ids.to_dict()))
+        return info
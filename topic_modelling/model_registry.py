@@ -0,0 +1,124 @@
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from src.instrumentation import _rss_bytes
+from topic_modelling.embedding_stage import EmbeddingStage
+from topic_modelling.embedding_store import EmbeddingStore
+
+with open("../config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+# the sentence-embedding model BERTopic uses for language="multilingual"
+DEFAULT_EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+class ModelRegistry:
+    def __init__(self, model_folder=None):
+        """Loads each model once per process and keeps it for later calls (and Streamlit reruns).
+
+        Models are read from model_folder when a copy is saved there, so the apps work offline
+        and never download on a button click.
+
+        Args:
+            model_folder (str, optional): Folder of saved models, e.g. model_folder/<embedding model name>
+                                          for a SentenceTransformer saved with .save(). Default is
+                                          model_folder from config.yaml, or ../models/.
+        """
+        if model_folder is None:
+            model_folder = config.get("model_folder", "../models/")
+        self.model_folder = Path(model_folder)
+        self.models = {}
+        self.load_stats = []
+        # re-entrant, as loading a topic model also loads its embedding model
+        self._lock = threading.RLock()
+
+    def get(self, name, loader):
+        """Returns the model called name, calling loader() to load it the first time only."""
+        with self._lock:
+            if name not in self.models:
+                memory_before = _rss_bytes()
+                start = time.perf_counter()
+                self.models[name] = loader()
+                seconds = time.perf_counter() - start
+                memory_after = _rss_bytes()
+                self.load_stats.append(
+                    {
+                        "name": name,
+                        "load_seconds": seconds,
+                        "memory_increase": None
+                        if memory_before is None or memory_after is None
+                        else memory_after - memory_before,
+                        "rss_after_load": memory_after,
+                    }
+                )
+                print(f"Loaded {name} in {seconds:.1f}s")
+            return self.models[name]
+
+    def local_path(self, name):
+        """Returns model_folder/name if a saved model is there, otherwise name (to download it)."""
+        path = self.model_folder / name
+        return str(path) if path.exists() else name
+
+    def embedding_model(self, name=DEFAULT_EMBEDDING_MODEL):
+        """Returns the SentenceTransformer called name, loaded once."""
+
+        def load():
+            from sentence_transformers import SentenceTransformer
+
+            return SentenceTransformer(self.local_path(name), device="cpu")
+
+        return self.get(f"embedding:{name}", load)
+
+    def embedding_store(self, name=DEFAULT_EMBEDDING_MODEL):
+        """Returns the EmbeddingStore of the embedding model called name, with its index read once."""
+        return self.get(f"store:{name}", lambda: EmbeddingStore(name))
+
+    def embedding_stage(self, name=DEFAULT_EMBEDDING_MODEL):
+        """Returns the EmbeddingStage of the model called name. Small calls use the loaded model in this
+        process; large ones are sharded across worker processes, which stay up for later calls."""
+        return self.get(
+            f"stage:{name}",
+            lambda: EmbeddingStage(self.local_path(name), model=self.embedding_model(name)),
+        )
+
+    def embed(self, texts, name=DEFAULT_EMBEDDING_MODEL):
+        """Embeds texts with the model called name, only running the model on texts not stored yet."""
+        return self.embedding_store(name).embed(texts, self.embedding_stage(name))
+
+    def topic_model(self, name="bertopic", embedding_model_name=DEFAULT_EMBEDDING_MODEL):
+        """Returns the fitted BERTopic saved as model_folder/name, loaded once, or None if there is none."""
+        path = self.model_folder / name
+        if not path.exists():
+            return None
+
+        def load():
+            from bertopic import BERTopic
+
+            return BERTopic.load(
+                str(path), embedding_model=self.embedding_model(embedding_model_name)
+            )
+
+        return self.get(f"topic:{name}", load)
+
+    def stats(self):
+        """Returns the load time and memory increase of every loaded model as a DataFrame."""
+        return pd.DataFrame(
+            self.load_stats, columns=["name", "load_seconds", "memory_increase", "rss_after_load"]
+        )
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Returns the process-wide ModelRegistry, shared by every Streamlit session and rerun."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
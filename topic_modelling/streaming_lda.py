@@ -0,0 +1,121 @@
+import os
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+import pandas as pd
+from gensim import corpora, models
+
+from topic_modelling.incremental import tokenize_document
+
+
+class DocumentStream:
+    def __init__(self, path, column=None, chunksize=10000, **read_csv_kwargs):
+        """Iterates over the tokens of each document in a file, reading it from disk on every pass.
+
+        Args:
+            path (str): A .txt file with one document per line, or a .csv file.
+            column (str, optional): The text column of a .csv file. Required for .csv files.
+            chunksize (int, optional): Rows of a .csv file read at a time. Default is 10000.
+            **read_csv_kwargs: Arguments for pd.read_csv, overriding REVIEW_CSV_KWARGS
+                               (the settings of the review exports, see cleaning.data_loader).
+        """
+        self.path = Path(path)
+        self.column = column
+        self.chunksize = chunksize
+        self.read_csv_kwargs = read_csv_kwargs
+        if self.path.suffix.lower() == ".csv":
+            if column is None:
+                raise TypeError("column must be given for a .csv file")
+            # imported here, as cleaning.data_loader reads config.yaml when imported
+            from cleaning.data_loader import REVIEW_CSV_KWARGS
+
+            self.read_csv_kwargs = {**REVIEW_CSV_KWARGS, **read_csv_kwargs}
+
+    def texts(self):
+        if self.path.suffix.lower() == ".csv":
+            chunks = pd.read_csv(
+                self.path, usecols=[self.column], chunksize=self.chunksize, **self.read_csv_kwargs
+            )
+            for chunk in chunks:
+                yield from chunk[self.column].dropna().astype(str)
+        else:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield line
+
+    def __iter__(self):
+        for text in self.texts():
+            yield tokenize_document(text)
+
+
+def streaming_topic_modeling(
+    path,
+    column=None,
+    num_topics=5,
+    num_words=10,
+    workers=None,
+    folder=None,
+    no_below=5,
+    no_above=0.5,
+    keep_n=100000,
+    passes=1,
+    chunksize=2000,
+    **read_csv_kwargs,
+):
+    """Trains LDA on many documents without holding them in memory, using several cores.
+
+    The file is read twice: once to build the Dictionary, which filter_extremes caps to keep_n
+    words, and once to write the bag-of-words corpus to a Matrix Market file. LdaMulticore then
+    trains on the MmCorpus read from disk, with workers processes running the E-step.
+
+    Args:
+        path (str): A .txt file with one document per line, or a .csv file (see DocumentStream).
+        column (str, optional): The text column of a .csv file.
+        num_topics (int, optional): Number of topics. Default is 5.
+        num_words (int, optional): Words per topic. Default is 10.
+        workers (int, optional): Worker processes. Default is one less than the number of cores.
+        folder (str, optional): Where to write the dictionary and corpus, to keep them. Default is
+                                a temporary folder, deleted once the model is trained.
+        no_below (int, optional): Drop words in fewer documents than this. Default is 5.
+        no_above (float, optional): Drop words in more than this fraction of documents. Default is 0.5.
+        keep_n (int, optional): Keep at most this many words. Default is 100000.
+        passes (int, optional): Passes over the corpus. Default is 1.
+        chunksize (int, optional): Documents per training chunk. Default is 2000.
+        **read_csv_kwargs: Arguments for pd.read_csv when reading a .csv file (see DocumentStream).
+
+    Returns:
+        list: (topic id, top words) for every topic, as perform_topic_modeling returns.
+    """
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) - 1)
+    documents = DocumentStream(path, column, **read_csv_kwargs)
+    with ExitStack() as stack:
+        if folder is None:
+            folder = stack.enter_context(tempfile.TemporaryDirectory(prefix="streaming_lda_"))
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        dictionary = corpora.Dictionary(documents)
+        dictionary.filter_extremes(no_below=no_below, no_above=no_above, keep_n=keep_n)
+        dictionary.save(str(folder / f"{documents.path.stem}.dict"))
+
+        corpus_path = str(folder / f"{documents.path.stem}.mm")
+        corpora.MmCorpus.serialize(
+            corpus_path, (dictionary.doc2bow(tokens) for tokens in documents)
+        )
+        corpus = corpora.MmCorpus(corpus_path)
+
+        lda_model = models.LdaMulticore(
+            corpus=corpus,
+            id2word=dictionary,
+            num_topics=num_topics,
+            workers=workers,
+            passes=passes,
+            chunksize=chunksize,
+        )
+        return [
+            (f"Topic {idx}", [word for word, _ in lda_model.show_topic(idx, topn=num_words)])
+            for idx in range(num_topics)
+        ]